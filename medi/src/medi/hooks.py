@@ -2,6 +2,8 @@ from kedro.framework.hooks import hook_impl
 from pyspark import SparkConf
 from pyspark.sql import SparkSession
 
+from medi.utils import http_client, journal, llm_cache, llm_gateway
+
 
 class SparkHooks:
     @hook_impl
@@ -22,3 +24,15 @@ class SparkHooks:
         )
         _spark_session = spark_session_conf.getOrCreate()
         _spark_session.sparkContext.setLogLevel("WARN")
+
+
+class ExternalServicesHooks:
+    @hook_impl
+    def after_context_created(self, context) -> None:
+        """Configures the shared clients used for external lookups,
+        the LLM gateway, the LLM response cache and the row journals from the project's parameters.
+        """
+        http_client.configure(context.params.get("http_client_params"))
+        llm_gateway.configure(context.params.get("llm_gateway_params"))
+        llm_cache.configure(context.params.get("llm_cache_params"))
+        journal.configure(context.params.get("journal_params"))
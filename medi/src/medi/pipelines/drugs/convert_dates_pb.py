@@ -1,5 +1,6 @@
 import pandas as pd
 from datetime import datetime
+from medi.utils import dates
 
 def convert_date_format(df):
     """
@@ -14,9 +15,9 @@ def convert_date_format(df):
     # Create a copy to avoid modifying the original dataframe
     df_converted = df.copy()
     
-    # Convert the date format
-    df_converted['approval_date'] = pd.to_datetime(df_converted['approval_date'], 
-                                                  format='%d-%b-%y').dt.strftime('%Y%m%d')
+    # Convert the date format; anything unparseable is kept as is
+    parsed = dates.parse_dates(df_converted['approval_date'], {'formats': ['%d-%b-%y']})
+    df_converted['approval_date'] = parsed.fillna(df_converted['approval_date'])
     
     return df_converted
 
@@ -28,5 +29,5 @@ def convert_date_format_inplace(df):
     Parameters:
     df (pd.DataFrame): DataFrame containing approval_date column
     """
-    df['approval_date'] = pd.to_datetime(df['approval_date'], 
-                                        format='%d-%b-%y').dt.strftime('%Y%m%d')
\ No newline at end of file
+    parsed = dates.parse_dates(df['approval_date'], {'formats': ['%d-%b-%y']})
+    df['approval_date'] = parsed.fillna(df['approval_date'])
\ No newline at end of file
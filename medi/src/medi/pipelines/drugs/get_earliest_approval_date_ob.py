@@ -1,6 +1,7 @@
 import pandas as pd 
 from tqdm import tqdm 
 from datetime import datetime
+from medi.utils import dates
 
 def get_approval_dates(df: pd.DataFrame, ingredient: str) -> list[str]:
     """
@@ -116,8 +117,9 @@ def convert_date_format(df):
     # Create a copy to avoid modifying the original dataframe
     df_converted = df.copy()
     
-    # Convert the date format
-    df_converted['approval_date'] = pd.to_datetime(df_converted['approval_date']).dt.strftime('%Y%m%d')
+    # Convert the date format; anything unparseable is kept as is
+    parsed = dates.parse_dates(df_converted['approval_date'])
+    df_converted['approval_date'] = parsed.fillna(df_converted['approval_date'])
     
     return df_converted
 
@@ -129,5 +131,6 @@ def convert_date_format_inplace(df):
     Parameters:
     df (pd.DataFrame): DataFrame containing approval_date column
     """
-    df['approval_date'] = pd.to_datetime(df['approval_date']).dt.strftime('%Y%m%d')
+    parsed = dates.parse_dates(df['approval_date'])
+    df['approval_date'] = parsed.fillna(df['approval_date'])
     return df
\ No newline at end of file
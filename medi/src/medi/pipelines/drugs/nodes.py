@@ -6,9 +6,10 @@ import pandas as pd
 import zipfile
 from pathlib import Path
 import random
+import json
 import tempfile
 from tqdm import tqdm
-from medi.utils import openai_tags, nameres, normalize
+from medi.utils import openai_tags, nameres, normalize, canonicalize, combinations, lexical_similarity, rerank, atc_rules, incremental, llm_cache, llm_batch, llm_gateway, journal
 import numpy as np
 from openai import OpenAI
 from . import grouped_bar
@@ -154,22 +155,131 @@ def add_unlisted_ingredients(df:pd.DataFrame)-> pd.DataFrame:
     return merged_df
 
 
-def split_combination_therapies(df:pd.DataFrame, params: dict)->pd.DataFrame:
+def tag_unknown(df: pd.DataFrame, tags: dict, labels_col: str, tagging_params: dict, known: pd.DataFrame) -> pd.DataFrame:
+    """
+    Fills the tag columns from known (one column per output_col, None where unknown) and sends
+    each drug through add_tags with only the tags still unknown for it. Drugs are grouped by
+    which tags they miss, so each group is one add_tags call.
+    """
+    df = df.copy()
+    output_cols = {name: tag['output_col'] for name, tag in tags.items()}
+    known = known.reindex(columns=list(output_cols.values()))
+    missing = known.isna()
+    for pattern, rows in missing.groupby(list(missing.columns)).groups.items():
+        pattern = pattern if isinstance(pattern, tuple) else (pattern,)
+        subset_tags = {name: tags[name] for name, is_missing in zip(output_cols, pattern) if is_missing}
+        if not subset_tags:
+            continue
+        tagged = openai_tags.add_tags(df.loc[rows].reset_index(drop=True), subset_tags, labels_col, tagging_params)
+        for tag in subset_tags.values():
+            known.loc[rows, tag['output_col']] = tagged[tag['output_col']].values
+    for output_col in known.columns:
+        df[output_col] = known[output_col]
+    return df
+
+def carry_forward_tags(df: pd.DataFrame, tags: dict, labels_col: str, old_list: pd.DataFrame = None, incremental_params: dict = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Flags carried forward from the previous release by incremental.carry_forward, or nothing when
+    incremental tagging is off.
+    """
+    if not (incremental_params and incremental_params.get('enabled')):
+        return pd.DataFrame(None, index=df.index, columns=[tag['output_col'] for tag in tags.values()], dtype=object), None
+    return incremental.carry_forward(df, old_list, tags, labels_col, incremental_params)
+
+def tag_combination_therapies(df: pd.DataFrame, tags: dict, labels_col: str, tagging_params: dict, canonicalization_params: dict, rule_params: dict, old_list: pd.DataFrame = None, incremental_params: dict = None) -> pd.DataFrame:
+    """
+    Tags combination therapies with the rules of combinations.analyze_combinations, sending only
+    the names the rules are not confident about through add_tags. With incremental tagging, those
+    names keep their previous flag when label and prompt are unchanged. The
+    combination_therapy_method column records how each row was tagged.
+    """
+    output_col = next(iter(tags.values()))['output_col']
+    rules = combinations.analyze_combinations(df['source_ingredients'], canonicalization_params, rule_params)
+    ambiguous = ~rules['confident']
+    known, hashes = carry_forward_tags(df, tags, labels_col, old_list, incremental_params)
+    carried = ambiguous & known[output_col].notna()
+    known[output_col] = rules['is_combination_therapy'].where(~ambiguous, known[output_col])
+    df['combination_therapy_method'] = np.select([~ambiguous, carried], ["rules", "previous_release"], "llm")
+    print(f"combination therapies: {(~ambiguous).sum()} of {len(df)} tagged by rules ({rules['is_combination_therapy'].eq(True).sum()} combinations), {carried.sum()} carried forward, {(ambiguous & ~carried).sum()} sent to the LLM")
+    df = tag_unknown(df, tags, labels_col, tagging_params, known)
+    if hashes is not None:
+        df = incremental.store_hashes(df, hashes, incremental_params)
+    return df
+
+def add_tags_with_atc_rules(df: pd.DataFrame, tags: dict, labels_col: str, tagging_params: dict, rules: dict, old_list: pd.DataFrame = None, incremental_params: dict = None) -> pd.DataFrame:
+    """
+    Sets the tags covered by atc_tag_rules to TRUE where the ATC codes found by get-atc imply
+    them, and asks the LLM only for the remaining tags of each drug. With incremental
+    tagging, flags whose label and prompt are unchanged since the previous release are carried
+    forward instead of asked again.
+    """
+    flags = atc_rules.flags_from_atc(df['atc_codes'], rules)
+    for output_col in flags.columns:
+        print(f"{output_col}: {flags[output_col].notna().sum()} of {len(df)} drugs tagged TRUE from ATC codes")
+    known, hashes = carry_forward_tags(df, tags, labels_col, old_list, incremental_params)
+    for output_col in flags.columns.intersection(known.columns):
+        known[output_col] = flags[output_col].where(flags[output_col].notna(), known[output_col])
+    df = tag_unknown(df, tags, labels_col, tagging_params, known)
+    if hashes is not None:
+        df = incremental.store_hashes(df, hashes, incremental_params)
+    return df
+
+def split_combination_therapies(df:pd.DataFrame, params: dict, canonicalization_params: dict = None, rule_params: dict = None)->pd.DataFrame:
+    """
+    Splits tagged combination therapies into "|"-separated ingredients. With rule params, names
+    the rules split confidently are not sent to the LLM.
+    """
+    split_by_rules = pd.Series(index=df.index, dtype=object)
+    if rule_params:
+        rules = combinations.analyze_combinations(df['source_ingredients'], canonicalization_params, rule_params)
+        confident = rules['confident'] & rules['is_combination_therapy'].eq(True)
+        split_by_rules = rules['combination_therapy_ingredients'].where(confident)
+    checkpoint = journal.open_journal("split_combination_therapies", df[['source_ingredients', 'is_combination_therapy']], params['model_params'])
     split_ingredients = []
     for idx, row in tqdm(df.iterrows(), total=len(df), desc="splitting combination therapies"):
-        if row['is_combination_therapy']==True:
+        if row['is_combination_therapy']==True and pd.notna(split_by_rules[idx]):
+            split_ingredients.append(split_by_rules[idx])
+        elif row['is_combination_therapy']==True:
             prompt = f"{params['model_params']['prompt']}{row['source_ingredients']}"
-            split_ingredients.append(openai_tags.single_openai_prompt(prompt = prompt, model=params['model_params']['model'], temperature=params['model_params']['temperature']  ))
+            key = journal.row_key(prompt, params['model_params']['model'])
+            if key not in checkpoint:
+                output = openai_tags.single_openai_prompt(prompt = prompt, model=params['model_params']['model'], temperature=params['model_params']['temperature']  )
+                if output != ['Error']:
+                    checkpoint.record(key, output)
+                split_ingredients.append(output)
+            else:
+                split_ingredients.append(checkpoint[key])
         else:
             split_ingredients.append("")
     
     df[params['output_col']]=split_ingredients
     return df
 
-def qc_id_llm(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+def qc_id_llm(df: pd.DataFrame, params: dict, tagging_params: dict = None, lexical_params: dict = None, canonicalization_params: dict = None) -> pd.DataFrame:
+    """
+    Checks that each NameRes hit names the same drug as the source string. With lexical_params
+    enabled, pairs are first scored by lexical_similarity and only the band between the reject and
+    accept thresholds is asked of the LLM; qc_method records how each row was decided.
+    """
     prompts_col = [f"Drug 1: {row['source_ingredients']}; Drug 2: {row['source_ingredients_curie_label']}" for idx, row in df.iterrows()]
     df['llm_qc_comparison_col'] = prompts_col
-    df = openai_tags.add_tags(df, params, 'llm_qc_comparison_col')
+    if not (lexical_params and lexical_params.get('enabled', True)):
+        return openai_tags.add_tags(df, params, 'llm_qc_comparison_col', tagging_params)
+
+    output_col = next(iter(params.values()))['output_col']
+    scores = lexical_similarity.score_pairs(df['source_ingredients'], df['source_ingredients_curie_label'], canonicalization_params, lexical_params)
+    decisions = lexical_similarity.classify_pairs(scores, lexical_params)
+    failed = df['source_ingredients_curie_label'] == "Error"
+    decisions.loc[failed, 'decision'] = False
+    decisions.loc[failed, 'method'] = "lexical_reject"
+    df[output_col] = decisions['decision']
+    df['qc_method'] = decisions['method']
+    df['qc_similarity'] = scores[['tfidf', 'token_set']].min(axis=1).round(3)
+    print(f"QC: {decisions['method'].value_counts().to_dict()}")
+    uncertain = decisions['method'] == "llm"
+    if uncertain.any():
+        tagged = openai_tags.add_tags(df[uncertain].reset_index(drop=True), params, 'llm_qc_comparison_col', tagging_params)
+        df.loc[uncertain, output_col] = tagged[output_col].values
     return df
 
 def build_improve_ids_prompt(concept: str, ids: list[str], labels: list[str]):
@@ -179,21 +289,89 @@ def build_improve_ids_prompt(concept: str, ids: list[str], labels: list[str]):
     ids_and_names = ";\n".join(ids_and_names)
     return f"Drug Concept: {concept}. \r\n\n Options: {ids_and_names}"
 
-def improve_ids(df: pd.DataFrame, nameres_params:dict, base_prompt: str) -> tuple[pd.DataFrame, pd.DataFrame]:
-    client = OpenAI()
+def candidates_for_row(row, nameres_params: dict) -> tuple[list[str], list[str]]:
+    """
+    Returns the NameRes candidates stored by nameres_column (store_candidates), falling back to a
+    new lookup for rows resolved without them.
+    """
+    stored = row.get('source_ingredients_candidate_curies')
+    if isinstance(stored, str):
+        return json.loads(stored), json.loads(row['source_ingredients_candidate_labels'])
+    return nameres.nameres(row['source_ingredients'], nameres_params)
+
+def improve_ids(df: pd.DataFrame, nameres_params:dict, base_prompt: str, batch_params: dict = None, cascade_params: dict = None, rerank_params: dict = None, canonicalization_params: dict = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Picks the best NameRes candidate for every row whose top hit failed QC. With rerank_params
+    enabled (see improve_ids_reranker), candidates are first reranked locally; decisive rows are
+    answered directly and the rest get a prompt with only the top_k options. With an enabled
+    cascade (see llm_cascade_params), the cheap model answers first and only answers that are not
+    one of the candidates (or NONE) or fall below the confidence threshold are asked again of the
+    escalation model.
+    """
+    client = OpenAI(max_retries=0)
+    model = "gpt-4o-mini"
+    concepts = {}
+    options = {}
+    for idx, row in df.iterrows():
+        if row['id_correct']!=True:
+            ids, labels = candidates_for_row(row, nameres_params)
+            concepts[idx] = row['source_ingredients']
+            options[idx] = (list(ids), list(labels))
+    reranked = {}
+    if rerank_params and rerank_params.get('enabled', True):
+        ranking = rerank.rerank_candidates(concepts, options, canonicalization_params, rerank_params)
+        for idx, ranked in ranking.iterrows():
+            if isinstance(ranked['decision'], str):
+                reranked[idx] = ranked['decision']
+            elif isinstance(ranked['top_curies'], list):
+                options[idx] = (ranked['top_curies'], ranked['top_labels'])
+        print(f"improving IDs: {len(reranked)} of {len(concepts)} decided by the local reranker, {len(concepts) - len(reranked)} pruned to top {rerank_params.get('top_k', 5)} for the LLM")
+    prompts = {}
+    candidates = {}
+    for idx, (ids, labels) in options.items():
+        if idx not in reranked:
+            candidates[idx] = ids
+            prompts[idx] = f"{base_prompt} {build_improve_ids_prompt(concepts[idx], ids, labels)}"
+    accepted = dict(reranked)
+    if openai_tags.cascade_enabled(cascade_params):
+        model = cascade_params['escalation_model']
+        cheap = openai_tags.logprob_prompts([[("user", prompt)] for prompt in prompts.values()], cascade_params['cheap_model'], cascade_params.get('temperature'), "improving IDs")
+        for idx, (content, tokens) in zip(prompts, cheap):
+            answer = content.strip() if content else None
+            valid = answer == "NONE" or answer in candidates[idx]
+            if valid and openai_tags.span_confidence(tokens, 0, len(content)) >= cascade_params['threshold']:
+                accepted[idx] = answer
+        openai_tags.report_escalation("improve_ids", len(prompts) - len(accepted) + len(reranked), len(prompts), cascade_params, model)
+    batched = {}
+    if llm_batch.batch_enabled(batch_params):
+        pending = [idx for idx in prompts if idx not in accepted]
+        requests = [([("user", prompts[idx])], model, None, None) for idx in pending]
+        contents = llm_batch.run_chat_batch(requests, batch_params, "improving IDs")
+        batched = {idx: content for idx, content in zip(pending, contents) if content is not None}
+
+    checkpoint = journal.open_journal("improve_ids", list(prompts.values()))
     corrected_id_column = []
-    for _, row in tqdm(df.iterrows(), total = len(df), desc = "improving IDs"):
+    for idx, row in tqdm(df.iterrows(), total = len(df), desc = "improving IDs"):
         if row['id_correct']==True:
             corrected_id_column.append(row['source_ingredients_curie'])
+        elif idx in accepted:
+            corrected_id_column.append(accepted[idx])
+        elif idx in batched:
+            corrected_id_column.append(batched[idx])
+        elif journal.row_key(prompts[idx], model) in checkpoint:
+            corrected_id_column.append(checkpoint[journal.row_key(prompts[idx], model)])
         else:
-            ids, labels = nameres.nameres(row['source_ingredients'], nameres_params)
-            prompt = f"{base_prompt} {build_improve_ids_prompt(row['source_ingredients'], list(ids), list(labels))}"
+            prompt = prompts[idx]
             try:
-                response = client.responses.create(
-                    model="gpt-4o-mini",
-                    input=prompt
+                output_text = llm_cache.cached_completion(
+                    lambda: llm_gateway.get_gateway().call(
+                        lambda: client.responses.create(model=model, input=prompt).output_text,
+                        "openai", llm_gateway.estimate_tokens(prompt),
+                    ),
+                    "openai", model, None, [("user", prompt)],
                 )
-                corrected_id_column.append(response.output_text)
+                checkpoint.record(journal.row_key(prompt, model), output_text)
+                corrected_id_column.append(output_text)
             except Exception as e:
                 corrected_id_column.append("Error")
     df['corrected_curie']=corrected_id_column
@@ -211,6 +389,114 @@ def improve_ids(df: pd.DataFrame, nameres_params:dict, base_prompt: str) -> tupl
     print(errors)
     return df, errors
 
+def union_source_ingredients(orangebook, purplebook, ema, pmda, russia, india) -> pd.DataFrame:
+    """
+    Collects the unique canonical ingredient keys across all regulator lists so that each one is
+    resolved, QC'd and normalized once per run, however many lists and surface forms it appears in.
+
+    Returns:
+        pd.DataFrame: single-column dataframe of unique keys, in a source_ingredients column
+    """
+    df_list = [orangebook, purplebook, ema, pmda, russia, india]
+    ingredients = pd.concat([df['source_ingredients_canonical'] for df in df_list], ignore_index=True)
+    ingredients = ingredients.dropna().drop_duplicates()
+    n_forms = pd.concat([df['source_ingredients'] for df in df_list]).nunique()
+    print(f"{len(ingredients)} unique ingredients ({n_forms} surface forms) across {sum(len(df) for df in df_list)} list entries")
+    return pd.DataFrame({'source_ingredients': ingredients}).reset_index(drop=True)
+
+def apply_ingredient_registry(df: pd.DataFrame, registry: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Fans the registry's resolution results back out to one regulator list.
+
+    Parameters:
+        df (pd.DataFrame): regulator list with a source_ingredients_canonical column
+        registry (pd.DataFrame): resolved and normalized ingredient registry, keyed by canonical key
+
+    Returns:
+        tuple: rows with a resolved ingredient, and rows whose ingredient could not be resolved
+    """
+    registry = registry.rename(columns={'source_ingredients': 'source_ingredients_canonical'})
+    merged = df.merge(registry, on='source_ingredients_canonical', how='left', validate='many_to_one')
+    mask = merged['corrected_curie'].notna()
+    return merged[mask].reset_index(drop=True), merged[~mask]
+
+def seed_ledger_from_list(previous_list: pd.DataFrame, canonicalization_params: dict, params: dict = None) -> pd.DataFrame:
+    """
+    Builds ledger entries from a released drug list, mapping the canonical key of every source
+    ingredient string to the curated curie. Keys that map to more than one curie are skipped.
+    The curie and label columns are the first of params['key_columns'] and
+    params['label_columns'] present, since released and intermediate lists name them
+    differently; a list without them seeds nothing.
+    """
+    params = params or {}
+    columns = ['source_ingredients', 'corrected_curie', 'corrected_curie_norm', 'corrected_curie_norm_label', 'alternate_ids', 'resolved_at', 'ledger_source']
+    key = next((column for column in params.get('key_columns', ['curie']) if column in previous_list.columns), None)
+    label = next((column for column in params.get('label_columns', ['label']) if column in previous_list.columns), None)
+    if key is None or label is None or 'source_ingredients' not in previous_list.columns:
+        print("previous release has no curie, label or source_ingredients column, not seeding the resolution ledger")
+        return pd.DataFrame(columns=columns)
+    seed = previous_list[[key, label, 'source_ingredients']].assign(
+        alternate_ids=previous_list['alternate_ids'] if 'alternate_ids' in previous_list.columns else None
+    ).dropna(subset=[key, 'source_ingredients'])
+    seed = seed.assign(source_ingredients=seed['source_ingredients'].astype(str).str.split('|')).explode('source_ingredients')
+    seed['source_ingredients'] = canonicalize.canonicalize_series(seed['source_ingredients'].str.strip(), canonicalization_params)
+    seed = seed.dropna(subset=['source_ingredients']).drop_duplicates(subset=['source_ingredients', key])
+    seed = seed[~seed['source_ingredients'].duplicated(keep=False)]
+    return pd.DataFrame({
+        'source_ingredients': seed['source_ingredients'],
+        'corrected_curie': seed[key],
+        'corrected_curie_norm': seed[key],
+        'corrected_curie_norm_label': seed[label],
+        'alternate_ids': seed['alternate_ids'],
+        'resolved_at': pd.Timestamp.today().strftime('%Y%m%d'),
+        'ledger_source': 'previous_release',
+    }, columns=columns).reset_index(drop=True)
+
+def split_by_resolution_ledger(registry: pd.DataFrame, ledger: pd.DataFrame, previous_list: pd.DataFrame, params: dict, canonicalization_params: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Looks every registry ingredient up in the resolution ledger before any external call.
+
+    An empty ledger is seeded from the previous release's curated mappings.
+
+    Parameters:
+        registry (pd.DataFrame): ingredient registry with a source_ingredients column
+        ledger (pd.DataFrame): persisted resolution ledger
+        previous_list (pd.DataFrame): previously released drug list
+        params (dict): resolution_ledger parameters (ttl_days, seeding columns)
+        canonicalization_params (dict): used to key the previous release's source strings
+
+    Returns:
+        tuple: registry rows to resolve (unseen or expired), and ledger rows reused as-is
+    """
+    if len(ledger) == 0 and params.get('seed_from_previous_release', True):
+        ledger = seed_ledger_from_list(previous_list, canonicalization_params, params)
+        print(f"seeded resolution ledger with {len(ledger)} entries from the previous release")
+    resolved_at = pd.to_datetime(ledger['resolved_at'].astype(str), format='%Y%m%d', errors='coerce')
+    fresh = ledger[resolved_at >= pd.Timestamp.today() - pd.Timedelta(days=params['ttl_days'])]
+    fresh = fresh.drop_duplicates(subset=['source_ingredients'], keep='last')
+
+    mask = registry['source_ingredients'].isin(fresh['source_ingredients'])
+    reused = fresh[fresh['source_ingredients'].isin(registry['source_ingredients'])].reset_index(drop=True)
+    print(f"resolution ledger: reusing {mask.sum()} of {len(registry)} ingredients, resolving {(~mask).sum()}")
+    return registry[~mask].reset_index(drop=True), reused
+
+def update_resolution_ledger(resolved: pd.DataFrame, reused: pd.DataFrame, ledger: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Adds this run's successfully normalized ingredients (and any entries seeded from the previous
+    release) to the ledger, replacing older entries for the same ingredient.
+
+    Returns:
+        tuple: the full normalized registry (resolved + reused), and the updated ledger
+    """
+    resolved = resolved.copy()
+    resolved['resolved_at'] = pd.Timestamp.today().strftime('%Y%m%d')
+    resolved['ledger_source'] = 'run'
+    succeeded = ~resolved['corrected_curie_norm'].astype(str).str.contains('Error')
+    updated = pd.concat([ledger, reused, resolved[succeeded]], ignore_index=True)
+    updated = updated.drop_duplicates(subset=['source_ingredients'], keep='last').reset_index(drop=True)
+    print(f"resolution ledger: {succeeded.sum()} new entries, {len(updated)} total")
+    return pd.concat([resolved, reused], ignore_index=True), updated[ledger.columns.union(resolved.columns, sort=False)]
+
 def join_lists(orangebook, purplebook, ema, pmda, russia, india)->pd.DataFrame:
     """
     Merge multiple dataframes based on the 'curie' field, combining matching rows.
@@ -242,7 +528,7 @@ def join_lists(orangebook, purplebook, ema, pmda, russia, india)->pd.DataFrame:
     return merged_df
 
 
-def compare(previous_list: pd.DataFrame, current_list: pd.DataFrame) -> pd.DataFrame:
+def compare(previous_list: pd.DataFrame, current_list: pd.DataFrame, nodenorm_params: dict) -> pd.DataFrame:
     
     #drugs_old = set(previous_list['improved_id'])
     #drugs_new = set(current_list['improved_id'])
@@ -261,9 +547,10 @@ def compare(previous_list: pd.DataFrame, current_list: pd.DataFrame) -> pd.DataF
     #print(previous_list)
     #print(current_list)
 
-    drugs_added_labels = (normalize.normalize(item)[1] for item in tqdm(drugs_added, desc="normalizing added drugs"))
-    drugs_removed_labels = (normalize.normalize(item)[1] for item in tqdm(drugs_removed, desc="normalizing removed drugs"))
-    drugs_same_labels = (normalize.normalize(item)[1] for item in tqdm(drugs_same, desc="normalizing unchanged drugs"))
+    results = normalize.normalize_curies(list(drugs_added | drugs_removed | drugs_same), nodenorm_params)
+    drugs_added_labels = (results[str(item)][1] for item in drugs_added)
+    drugs_removed_labels = (results[str(item)][1] for item in drugs_removed)
+    drugs_same_labels = (results[str(item)][1] for item in drugs_same)
 
     return pd.DataFrame({
         "drugs_added": pd.Series(list(drugs_added)),
@@ -293,7 +580,7 @@ def include_stringent_only(df:pd.DataFrame, tags: list[str]) -> pd.DataFrame:
     df_final = new_df.drop(['approved_india', 'approved_russia'], axis=1)
     return df_final
 
-def compare_drugcentral_drugbank(druglist_stringent: pd.DataFrame, druglist_flexible: pd.DataFrame, usa: pd.DataFrame, eur: pd.DataFrame, jpn: pd.DataFrame) -> pd.DataFrame:
+def compare_drugcentral_drugbank(druglist_stringent: pd.DataFrame, druglist_flexible: pd.DataFrame, usa: pd.DataFrame, eur: pd.DataFrame, jpn: pd.DataFrame, nodenorm_params: dict) -> pd.DataFrame:
     cols = ['drug_id', 'drug_name']
     usa.columns = cols
     eur.columns = cols
@@ -307,7 +594,7 @@ def compare_drugcentral_drugbank(druglist_stringent: pd.DataFrame, druglist_flex
     drugcentral_merged = combined_df.groupby('drug_name', as_index=False).agg(combine_rows)
     drugcentral_merged['drug_id_ont']=[f"DRUGCENTRAL:{row['drug_id']}" for idx, row in drugcentral_merged.iterrows()]
     drugcentral_norm = drugcentral_merged
-    drugcentral_norm = normalize.normalize_column(drugcentral_merged, "drug_id_ont")
+    drugcentral_norm = normalize.normalize_column(drugcentral_merged, "drug_id_ont", nodenorm_params)
 
     n_drugs_medi_stringent = len(druglist_stringent)
     n_drugs_medi_flexible = len(druglist_flexible)
@@ -3,8 +3,7 @@ from kedro.pipeline import node, Pipeline, pipeline
 from . import nodes, extract_ob, get_marketing, get_earliest_approval_date_ob
 import os
 from medi.utils import nameres, normalize
-from medi.utils import openai_tags
-from medi.utils import preprocess_lists, get_atc, get_smiles
+from medi.utils import preprocess_lists, get_atc, get_smiles, canonicalize, clustering, dates
 from . import convert_dates_pb
 
 def create_pipeline(**kwargs) -> Pipeline:
@@ -23,9 +22,18 @@ def create_pipeline(**kwargs) -> Pipeline:
             outputs = "ob-standardized",
             name = "standardize-cols-ob"
         ),
+        node(
+            func=canonicalize.add_canonical_column,
+            inputs = [
+                "ob-standardized",
+                "params:ingredient_canonicalization",
+            ],
+            outputs = "ob-canonicalized",
+            name = "canonicalize-ob"
+        ),
         node(
             func=get_marketing.add_most_permissive_marketing_tags_fda,
-            inputs = "ob-standardized",
+            inputs = "ob-canonicalized",
             outputs = "ob-with-marketing-tags",
             name = "get-marketing-tags-ob"
         ),
@@ -46,36 +54,16 @@ def create_pipeline(**kwargs) -> Pipeline:
             name = "deduplicate-ob"
         ),
         node(
-            func = nameres.nameres_column,
+            func=nodes.apply_ingredient_registry,
             inputs = [
                 "ob-deduplicated",
-                "params:standardization_mapping_ob.Ingredient",
-                "params:name_resolver_params"
-            ],
-            outputs = "ob-nameresolved",
-            name = "nameres-ob"
-        ),
-        node(
-            func = nodes.qc_id_llm,
-            inputs = [
-                "ob-nameresolved",
-                "params:id_correct_incorrect_tag",
-            ],
-            outputs = "ob-llm-id-qc",
-            name="qc-id-llm-ob"
-        ),
-        node(
-            func=nodes.improve_ids,
-            inputs = [
-                "ob-llm-id-qc",
-                "params:name_resolver_params_llm_improve",
-                "params:llm_best_id_tag_drug_prompt"
+                "ingredient-registry-expanded",
             ],
-            outputs =[
+            outputs = [
                 "ob-corrected-ids",
                 "ob-nameres-errors"
             ],
-            name = "select-best-ids-ob"
+            name = "apply-registry-ob"
         ),
         node(
             func=nodes.add_full_column_identical_strings,
@@ -84,7 +72,7 @@ def create_pipeline(**kwargs) -> Pipeline:
                 "params:approval_tags.usa",
                 "params:true_bool",
             ],
-            outputs="ob-usa-approved-tags",
+            outputs = "ob-norm",
             name = "add-approval-tags-ob"
         ),
         # node(
@@ -122,15 +110,6 @@ def create_pipeline(**kwargs) -> Pipeline:
         #     outputs = "ob-unlisted-single-ingredients",
         #     name = "add-unlisted-ingredients-ob"
         # ),
-        node(
-            func=normalize.normalize_column,
-            inputs = [
-                "ob-usa-approved-tags",
-                "params:best_id_column"
-            ],
-            outputs = "ob-norm",
-            name = "normalize-ob"
-        ),
 
 
 ##########################################################################################################
@@ -146,9 +125,18 @@ def create_pipeline(**kwargs) -> Pipeline:
             outputs = "pb-standardized",
             name = "standardize-cols-pb"
         ),
+        node(
+            func=canonicalize.add_canonical_column,
+            inputs = [
+                "pb-standardized",
+                "params:ingredient_canonicalization",
+            ],
+            outputs = "pb-canonicalized",
+            name = "canonicalize-pb"
+        ),
         node(
             func=get_marketing.add_most_permissive_marketing_tags_fda,
-            inputs = "pb-standardized",
+            inputs = "pb-canonicalized",
             outputs = "pb-marketing-tags",
             name = "get-marketing-tags-pb"
         ),
@@ -174,36 +162,16 @@ def create_pipeline(**kwargs) -> Pipeline:
             name = "deduplicate-pb"
         ),
         node(
-            func = nameres.nameres_column,
+            func=nodes.apply_ingredient_registry,
             inputs = [
                 "pb-deduplicated",
-                "params:standardization_mapping_ob.Ingredient",
-                "params:name_resolver_params"
-            ],
-            outputs = "pb-nameresolved",
-            name = "nameres-pb"
-        ),
-        node(
-            func = nodes.qc_id_llm,
-            inputs = [
-                "pb-nameresolved",
-                "params:id_correct_incorrect_tag",
-            ],
-            outputs = "pb-llm-id-qc",
-            name="qc-id-llm-pb"
-        ),
-        node(
-            func=nodes.improve_ids,
-            inputs = [
-                "pb-llm-id-qc",
-                "params:name_resolver_params_llm_improve",
-                "params:llm_best_id_tag_drug_prompt"
+                "ingredient-registry-expanded",
             ],
             outputs = [
                 "pb-corrected-ids",
                 "pb-nameres-errors"
-            ], 
-            name = "select-best-ids-pb"
+            ],
+            name = "apply-registry-pb"
         ),
         node(
             func=nodes.add_full_column_identical_strings,
@@ -212,7 +180,7 @@ def create_pipeline(**kwargs) -> Pipeline:
                 "params:approval_tags.usa",
                 "params:true_bool",
             ],
-            outputs="pb-usa-approved-tags",
+            outputs = "pb-norm",
             name = "add-approval-tags-pb"
         ),
         # node(
@@ -250,15 +218,6 @@ def create_pipeline(**kwargs) -> Pipeline:
         #     outputs = "pb-unlisted-single-ingredients",
         #     name = "add-unlisted-ingredients-pb"
         # ),
-        node(
-            func=normalize.normalize_column,
-            inputs = [
-                "pb-usa-approved-tags",
-                "params:best_id_column"
-            ],
-            outputs = "pb-norm",
-            name = "normalize-pb"
-        ),
 
 
 ##########################################################################################################
@@ -280,9 +239,18 @@ def create_pipeline(**kwargs) -> Pipeline:
             outputs = "ema-standardized",
             name = "standardize-cols-ema"
         ),
+        node(
+            func=canonicalize.add_canonical_column,
+            inputs = [
+                "ema-standardized",
+                "params:ingredient_canonicalization",
+            ],
+            outputs = "ema-canonicalized",
+            name = "canonicalize-ema"
+        ),
         node(
             func=preprocess_lists.reformat_dates_ema,
-            inputs = "ema-standardized",
+            inputs = "ema-canonicalized",
             outputs = "ema-reformatted-dates",
             name = "reformat-dates-ema"
         ),
@@ -296,36 +264,16 @@ def create_pipeline(**kwargs) -> Pipeline:
             name = "deduplicate-ema"
         ),
         node(
-            func = nameres.nameres_column,
+            func=nodes.apply_ingredient_registry,
             inputs = [
                 "ema-deduplicated",
-                "params:standardization_mapping_ob.Ingredient",
-                "params:name_resolver_params"
-            ],
-            outputs = "ema-nameresolved",
-            name = "nameres-ema"
-        ),
-        node(
-            func = nodes.qc_id_llm,
-            inputs = [
-                "ema-nameresolved",
-                "params:id_correct_incorrect_tag",
-            ],
-            outputs = "ema-llm-id-qc",
-            name="qc-id-llm-ema"
-        ),
-        node(
-            func=nodes.improve_ids,
-            inputs = [
-                "ema-llm-id-qc",
-                "params:name_resolver_params_llm_improve",
-                "params:llm_best_id_tag_drug_prompt"
+                "ingredient-registry-expanded",
             ],
             outputs = [
                 "ema-corrected-ids",
                 "ema-nameres-errors"
             ],
-            name = "select-best-ids-ema"
+            name = "apply-registry-ema"
         ),
         node(
             func=nodes.add_full_column_identical_strings,
@@ -334,7 +282,7 @@ def create_pipeline(**kwargs) -> Pipeline:
                 "params:approval_tags.eur",
                 "params:true_bool",
             ],
-            outputs="ema-approved-tags",
+            outputs = "ema-norm",
             name = "add-approval-tags-ema"
         ),
         # node(
@@ -372,15 +320,6 @@ def create_pipeline(**kwargs) -> Pipeline:
         #     outputs = "ema-unlisted-single-ingredients",
         #     name = "add-unlisted-ingredients-ema"
         # ),
-        node(
-            func=normalize.normalize_column,
-            inputs = [
-                "ema-approved-tags",
-                "params:best_id_column"
-            ],
-            outputs = "ema-norm",
-            name = "normalize-ema"
-        ),
 
 
 ##########################################################################################################
@@ -404,55 +343,44 @@ def create_pipeline(**kwargs) -> Pipeline:
             name = "standardize-cols-pmda"
         ),
         node(
-            func=nodes.deduplicate_with_join,
+            func=canonicalize.add_canonical_column,
             inputs = [
                 "pmda-standardized",
+                "params:ingredient_canonicalization",
+            ],
+            outputs = "pmda-canonicalized",
+            name = "canonicalize-pmda"
+        ),
+        node(
+            func=nodes.deduplicate_with_join,
+            inputs = [
+                "pmda-canonicalized",
                 "params:deduplication_columns",
             ],
             outputs = "pmda-deduplicated",
             name = "deduplicate-pmda"
         ),
         node(
-            func=openai_tags.add_tags,
+            func=dates.reformat_dates,
             inputs = [
                 "pmda-deduplicated",
-                "params:date_reformatting_tag",
-                "params:source_ingredients_column"
+                "params:date_parsing",
+                "params:date_reformatting_tag.params"
             ],
             outputs = "pmda-reformatted-dates",
             name = 'reformat-dates-pmda'
         ),
         node(
-            func = nameres.nameres_column,
+            func=nodes.apply_ingredient_registry,
             inputs = [
                 "pmda-reformatted-dates",
-                "params:standardization_mapping_ob.Ingredient",
-                "params:name_resolver_params"
-            ],
-            outputs = "pmda-nameresolved",
-            name = "nameres-pmda"
-        ),
-        node(
-            func = nodes.qc_id_llm,
-            inputs = [
-                "pmda-nameresolved",
-                "params:id_correct_incorrect_tag",
-            ],
-            outputs = "pmda-llm-id-qc",
-            name="qc-id-llm-pmda"
-        ),
-        node(
-            func=nodes.improve_ids,
-            inputs = [
-                "pmda-llm-id-qc",
-                "params:name_resolver_params_llm_improve",
-                "params:llm_best_id_tag_drug_prompt"
+                "ingredient-registry-expanded",
             ],
             outputs = [
                 "pmda-corrected-ids",
                 "pmda-nameres-errors"
             ],
-            name = "select-best-ids-pmda"
+            name = "apply-registry-pmda"
         ),
         node(
             func=nodes.add_full_column_identical_strings,
@@ -461,7 +389,7 @@ def create_pipeline(**kwargs) -> Pipeline:
                 "params:approval_tags.jpn",
                 "params:true_bool",
             ],
-            outputs="pmda-approved-tags",
+            outputs = "pmda-norm",
             name = "add-approval-tags-pmda"
         ),
         # node(
@@ -499,15 +427,6 @@ def create_pipeline(**kwargs) -> Pipeline:
         #     outputs = "pmda-unlisted-single-ingredients",
         #     name = "add-unlisted-ingredients-pmda"
         # ),
-        node(
-            func=normalize.normalize_column,
-            inputs = [
-                "pmda-approved-tags",
-                "params:best_id_column"
-            ],
-            outputs = "pmda-norm",
-            name = "normalize-pmda"
-        ),
         
 
 
@@ -526,55 +445,44 @@ def create_pipeline(**kwargs) -> Pipeline:
             name = "standardize-cols-russia"
         ),
         node(
-            func=nodes.deduplicate_with_join,
+            func=canonicalize.add_canonical_column,
             inputs = [
                 "russia-standardized",
+                "params:ingredient_canonicalization",
+            ],
+            outputs = "russia-canonicalized",
+            name = "canonicalize-russia"
+        ),
+        node(
+            func=nodes.deduplicate_with_join,
+            inputs = [
+                "russia-canonicalized",
                 "params:deduplication_columns",
             ],
             outputs = "russia-deduplicated",
             name = "deduplicate-russia"
         ),
         node(
-            func=openai_tags.add_tags,
+            func=dates.reformat_dates,
             inputs = [
                 "russia-deduplicated",
-                "params:date_reformatting_tag",
-                "params:source_ingredients_column"
+                "params:date_parsing",
+                "params:date_reformatting_tag.params"
             ],
             outputs = "russia-reformatted-dates",
             name = 'reformat-dates-russia'
         ),
         node(
-            func = nameres.nameres_column,
+            func=nodes.apply_ingredient_registry,
             inputs = [
                 "russia-reformatted-dates",
-                "params:standardization_mapping_ob.Ingredient",
-                "params:name_resolver_params"
-            ],
-            outputs = "russia-nameresolved",
-            name = "nameres-russia"
-        ),
-        node(
-            func = nodes.qc_id_llm,
-            inputs = [
-                "russia-nameresolved",
-                "params:id_correct_incorrect_tag",
-            ],
-            outputs = "russia-llm-id-qc",
-            name="qc-id-llm-russia"
-        ),
-        node(
-            func=nodes.improve_ids,
-            inputs = [
-                "russia-llm-id-qc",
-                "params:name_resolver_params_llm_improve",
-                "params:llm_best_id_tag_drug_prompt"
+                "ingredient-registry-expanded",
             ],
             outputs = [
                 "russia-corrected-ids",
                 "russia-nameres-errors"
             ],
-            name = "select-best-ids-russia"
+            name = "apply-registry-russia"
         ),
         node(
             func=nodes.add_full_column_identical_strings,
@@ -583,17 +491,8 @@ def create_pipeline(**kwargs) -> Pipeline:
                 "params:approval_tags.rus",
                 "params:true_bool",
             ],
-            outputs="russia-approved-tags",
-            name = "add-approval-tags-russia"
-        ),
-        node(
-            func=normalize.normalize_column,
-            inputs = [
-                "russia-approved-tags",
-                "params:best_id_column"
-            ],
             outputs = "russia-norm",
-            name = "normalize-russia"
+            name = "add-approval-tags-russia"
         ),
 
 ##########################################################################################################
@@ -609,77 +508,174 @@ def create_pipeline(**kwargs) -> Pipeline:
             name = "standardize-cols-india"
         ),
         node(
-            func=nodes.deduplicate_with_join,
+            func=canonicalize.add_canonical_column,
             inputs = [
                 "india-standardized",
+                "params:ingredient_canonicalization",
+            ],
+            outputs = "india-canonicalized",
+            name = "canonicalize-india"
+        ),
+        node(
+            func=nodes.deduplicate_with_join,
+            inputs = [
+                "india-canonicalized",
                 "params:deduplication_columns",
             ],
             outputs = "india-deduplicated",
             name = "deduplicate-india"
         ),
         node(
-            func=openai_tags.add_tags,
+            func=dates.reformat_dates,
             inputs = [
                 "india-deduplicated",
-                "params:date_reformatting_tag",
-                "params:source_ingredients_column"
+                "params:date_parsing",
+                "params:date_reformatting_tag.params"
             ],
             outputs = "india-reformatted-dates",
             name = 'reformat-dates-india'
         ),
         node(
-            func = nameres.nameres_column,
+            func=nodes.apply_ingredient_registry,
+            inputs = [
+                "india-reformatted-dates",
+                "ingredient-registry-expanded",
+            ],
+            outputs = [
+                "india-corrected-ids",
+                "india-nameres-errors"
+            ],
+            name = "apply-registry-india"
+        ),
+        node(
+            func=nodes.add_full_column_identical_strings,
+            inputs = [
+                "india-corrected-ids",
+                "params:approval_tags.ind",
+                "params:true_bool",
+            ],
+            outputs = "india-norm",
+            name = "add-approval-tags-india"
+        ),
+
+
+
+##########################################################################################################
+########### INGREDIENT REGISTRY ##########################################################################
+##########################################################################################################
+        node(
+            func=nodes.union_source_ingredients,
             inputs = [
+                "ob-deduplicated",
+                "pb-deduplicated",
+                "ema-deduplicated",
+                "pmda-reformatted-dates",
+                "russia-reformatted-dates",
                 "india-reformatted-dates",
+            ],
+            outputs = "ingredient-registry",
+            name = "build-ingredient-registry"
+        ),
+        node(
+            func = clustering.cluster_column,
+            inputs = [
+                "ingredient-registry",
+                "params:source_ingredients_column",
+                "params:ingredient_clustering",
+            ],
+            outputs = [
+                "ingredient-registry-representatives",
+                "ingredient-registry-clusters",
+            ],
+            name = "cluster-ingredient-registry"
+        ),
+        node(
+            func = nodes.split_by_resolution_ledger,
+            inputs = [
+                "ingredient-registry-representatives",
+                "resolution-ledger",
+                "old-list",
+                "params:resolution_ledger",
+                "params:ingredient_canonicalization",
+            ],
+            outputs = [
+                "ingredient-registry-to-resolve",
+                "ingredient-registry-reused",
+            ],
+            name = "lookup-resolution-ledger"
+        ),
+        node(
+            func = nameres.nameres_column,
+            inputs = [
+                "ingredient-registry-to-resolve",
                 "params:standardization_mapping_ob.Ingredient",
-                "params:name_resolver_params"
+                "params:name_resolver_params_llm_improve"
             ],
-            outputs = "india-nameresolved",
-            name = "nameres-india"
+            outputs = "ingredient-registry-nameresolved",
+            name = "nameres-registry"
         ),
         node(
             func = nodes.qc_id_llm,
             inputs = [
-                "india-nameresolved",
+                "ingredient-registry-nameresolved",
                 "params:id_correct_incorrect_tag",
+                "params:llm_packed_tagging_params",
+                "params:qc_lexical_params",
+                "params:ingredient_canonicalization",
             ],
-            outputs = "india-llm-id-qc",
-            name="qc-id-llm-india"
+            outputs = "ingredient-registry-llm-id-qc",
+            name="qc-id-llm-registry"
         ),
         node(
             func=nodes.improve_ids,
             inputs = [
-                "india-llm-id-qc",
+                "ingredient-registry-llm-id-qc",
                 "params:name_resolver_params_llm_improve",
-                "params:llm_best_id_tag_drug_prompt"
+                "params:llm_best_id_tag_drug_prompt",
+                "params:llm_batch_params",
+                "params:llm_cascade_params",
+                "params:improve_ids_reranker",
+                "params:ingredient_canonicalization",
             ],
             outputs = [
-                "india-corrected-ids",
-                "india-nameres-errors"
+                "ingredient-registry-corrected-ids",
+                "ingredient-registry-nameres-errors"
             ],
-            name = "select-best-ids-india"
+            name = "select-best-ids-registry"
         ),
         node(
-            func=nodes.add_full_column_identical_strings,
+            func=normalize.normalize_column,
             inputs = [
-                "india-corrected-ids",
-                "params:approval_tags.ind",
-                "params:true_bool",
+                "ingredient-registry-corrected-ids",
+                "params:best_id_column",
+                "params:nodenorm_params"
             ],
-            outputs="india-approved-tags",
-            name = "add-approval-tags-india"
+            outputs = "ingredient-registry-norm-new",
+            name = "normalize-registry"
         ),
         node(
-            func=normalize.normalize_column,
+            func = nodes.update_resolution_ledger,
             inputs = [
-                "india-approved-tags",
-                "params:best_id_column"
+                "ingredient-registry-norm-new",
+                "ingredient-registry-reused",
+                "resolution-ledger",
             ],
-            outputs = "india-norm",
-            name = "normalize-india"
+            outputs = [
+                "ingredient-registry-norm",
+                "resolution-ledger-updated",
+            ],
+            name = "update-resolution-ledger"
+        ),
+        node(
+            func = clustering.expand_clusters,
+            inputs = [
+                "ingredient-registry-norm",
+                "ingredient-registry-clusters",
+                "params:source_ingredients_column",
+            ],
+            outputs = "ingredient-registry-expanded",
+            name = "expand-registry-clusters"
         ),
-
-
 
 ##########################################################################################################
 ########### ALL LISTS ####################################################################################
@@ -699,36 +695,45 @@ def create_pipeline(**kwargs) -> Pipeline:
             name = "join-lists"
         ),
         node(
-            func=openai_tags.add_tags,
+            func=get_atc.get_atc_codes_for_dataframe,
             inputs = [
                 "joined-list",
-                "params:enrichment_tags",
-                "params:label_column",
+                "atc-codes",
             ],
-            outputs = "list-with-tags",
-            name = "add-drug-tags"
+            outputs="list-with-atc",
+            name = "get-atc"
         ),
         node(
-            func=get_atc.get_atc_codes_for_dataframe,
+            func=nodes.add_tags_with_atc_rules,
             inputs = [
-                "list-with-tags",
-                "atc-codes",
+                "list-with-atc",
+                "params:enrichment_tags",
+                "params:label_column",
+                "params:llm_tagging_params",
+                "params:atc_tag_rules",
+                "old-list",
+                "params:incremental_tagging",
             ],
-            outputs="list-with-atc",
-            name = "get-atc"
+            outputs = "list-with-tags",
+            name = "add-drug-tags"
         ),
         node(
             func=get_smiles.add_SMILES_strings,
-            inputs = "list-with-atc",
+            inputs = "list-with-tags",
             outputs = "list-with-smiles",
             name = "get-smiles"
         ),
         node(
-            func=openai_tags.add_tags,
+            func=nodes.tag_combination_therapies,
             inputs = [
                 "list-with-smiles",
                 "params:combo_therapy_tags",
-                "params:label_column"
+                "params:label_column",
+                "params:llm_packed_tagging_params",
+                "params:ingredient_canonicalization",
+                "params:combination_rules",
+                "old-list",
+                "params:incremental_tagging",
             ],
             outputs = "list-with-combo-therapy-tags",
             name = 'tag-combo-therapies'
@@ -737,7 +742,9 @@ def create_pipeline(**kwargs) -> Pipeline:
             func=nodes.split_combination_therapies,
             inputs=[
                 "list-with-combo-therapy-tags",
-                "params:combination_therapy_split_drug"
+                "params:combination_therapy_split_drug",
+                "params:ingredient_canonicalization",
+                "params:combination_rules",
             ],
             outputs = "list-with-split-ingredients",
             name = "split-ingredients"
@@ -792,6 +799,7 @@ def create_pipeline(**kwargs) -> Pipeline:
             inputs=[
                 "old-list",
                 "list-with-smiles",
+                "params:nodenorm_params"
             ],
             outputs="drug-list-v2v-log",
             name = "compare-drug-list-versions"
@@ -804,7 +812,8 @@ def create_pipeline(**kwargs) -> Pipeline:
                 "drug_list_flexible",
                 "drugcentral_usa_approved",
                 "drugcentral_europe_approved",
-                "drugcentral_japan_approved"
+                "drugcentral_japan_approved",
+                "params:nodenorm_params"
             ],
             outputs = "drugcentral_merged",
             name = "compare-drugcentral-drugbank"
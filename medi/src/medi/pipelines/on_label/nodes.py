@@ -24,6 +24,7 @@ import matplotlib.pyplot as plt
 import vertexai
 from vertexai.generative_models import GenerativeModel, Part, SafetySetting, FinishReason
 import vertexai.preview.generative_models as generative_models
+from medi.utils import llm_cache, llm_batch, llm_gateway
 
 #from ontobio import OntologyFactory
 #from ontobio.ontol_factory import OntologyFactory
@@ -70,18 +71,28 @@ def clean_empty_rows(inList, column_name) -> pd.DataFrame:
     inList.drop(indices_to_drop, inplace=True)
     return inList
 
-def extract_named_diseases(inList:pd.DataFrame, drug_names_column:str, passage_column:str, structured_list_column:str, structured_list_prompt: str) -> pd.DataFrame:
+def extract_named_diseases(inList:pd.DataFrame, drug_names_column:str, passage_column:str, structured_list_column:str, structured_list_prompt: str, batch_params: dict = None, batch_model: str = None) -> pd.DataFrame:
+    """
+    With batch_params enabled, the prompts are sent as offline batch jobs to batch_model on the
+    OpenAI-compatible batch endpoint (llm_batch_params.base_url); prompts the batch did not
+    answer fall back to generate().
+    """
     inList = clean_empty_rows(inList, passage_column)
     # New Fields to Add
     diseases_mentioned = []
     # Fetch Columns
     indications_data = list(inList[passage_column])
     active_ingredients_data = list(inList[drug_names_column])
+    batched = [None] * len(indications_data)
+    if llm_batch.batch_enabled(batch_params):
+        n_items = min(limit, len(indications_data)) if testing else len(indications_data)
+        requests = [([("user", structured_list_prompt + item)], batch_model, generation_config["temperature"], None) for item in indications_data[:n_items]]
+        batched[:n_items] = llm_batch.run_chat_batch(requests, batch_params, "extracting indications")
     for index, item in tqdm(enumerate(indications_data), total=(limit if testing else len(indications_data))):
         if  (index < limit) or not testing:
             try:
                 prompt = structured_list_prompt + item
-                diseases_mentioned.append(generate(prompt))
+                diseases_mentioned.append(batched[index] if batched[index] is not None else generate(prompt))
             except Exception as e:
                 print(e)
                 diseases_mentioned.append("LLM EXTRACTION ERROR")
@@ -92,6 +103,13 @@ def extract_named_diseases(inList:pd.DataFrame, drug_names_column:str, passage_c
 
 @cache
 def generate(input_text):
+        return llm_cache.cached_completion(
+            lambda: llm_gateway.get_gateway().call(lambda: _generate(input_text), "vertexai", llm_gateway.estimate_tokens(input_text)),
+            "vertexai", "gemini-2.0-flash", generation_config["temperature"], [input_text],
+            generation_config=generation_config, safety_settings=[item.to_dict() for item in safety_settings],
+        )
+
+def _generate(input_text):
         vertexai.init(project="mtrx-wg2-modeling-dev-9yj", location="us-east1")
         model = GenerativeModel(
             "gemini-2.0-flash",
@@ -23,6 +23,8 @@ def create_pipeline(**kwargs) -> Pipeline:
                 "params:column_names.indications_text_column",
                 "params:column_names.indications_structured_list_column",
                 "params:indications_structured_list_prompt",
+                "params:llm_batch_params",
+                "params:indications_batch_model",
             ],
             outputs = "dailymed_indications_named_diseases",
             name = "extract-indications-lists-fda",
@@ -0,0 +1,40 @@
+import ast
+
+import pandas as pd
+
+
+def parse_atc_codes(value) -> list[str]:
+    """
+    ATC codes of one drug as a list; lists read back from Excel/CSV arrive as their string form.
+    """
+    if isinstance(value, str):
+        try:
+            value = ast.literal_eval(value)
+        except (SyntaxError, ValueError):
+            value = [item.strip("'\" ") for item in value.strip("[]").split(",")]
+    if not isinstance(value, (list, tuple)):
+        return []
+    return [str(item).strip() for item in value if item and str(item).strip()]
+
+
+def flags_from_atc(atc_codes: pd.Series, rules: dict) -> pd.DataFrame:
+    """
+    Derives tag flags from ATC codes (see atc_tag_rules in parameters.yml: output column -> ATC
+    prefixes). A flag is True when every ATC code of the drug falls under one of the tag's
+    prefixes. ATC classifies by main therapeutic use, so a code outside the prefixes does not
+    make a tag False (fluorescein is a diagnostic under S01JA, budesonide/formoterol a steroid
+    under R03AK): those drugs, drugs whose codes disagree and drugs without ATC codes get None
+    and are left to the LLM.
+
+    Returns:
+        pd.DataFrame: one column per rule, aligned with atc_codes
+    """
+    codes = atc_codes.map(parse_atc_codes).explode().dropna()
+    flags = pd.DataFrame(index=atc_codes.index)
+    for output_col, prefixes in rules.items():
+        matches = codes.str.upper().str.startswith(tuple(prefix.upper() for prefix in prefixes))
+        all_match = matches.groupby(level=0).all().reindex(atc_codes.index, fill_value=False).astype(bool)
+        flag = pd.Series([None] * len(atc_codes), index=atc_codes.index, dtype=object)
+        flag[all_match] = True
+        flags[output_col] = flag
+    return flags
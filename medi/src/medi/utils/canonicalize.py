@@ -0,0 +1,114 @@
+import re
+
+import pandas as pd
+
+
+def _alternation(tokens: list[str]) -> str:
+    # longest first so e.g. "hydrochloride" wins over "chloride"
+    return "|".join(re.escape(token) for token in sorted(set(tokens), key=len, reverse=True))
+
+
+def delimiter_pattern(delimiters: list[str]) -> re.Pattern:
+    """
+    Case-insensitive pattern matching any combination delimiter. Punctuation delimiters are not
+    matched between two digits, so ratios such as "insulin 70/30" stay in one piece.
+    """
+    alternatives = []
+    for item in sorted(delimiters, key=len, reverse=True):
+        if item.strip().isalpha():
+            alternatives.append(re.escape(item))
+        else:
+            delimiter = re.escape(item.strip())
+            alternatives.append(rf"(?<!\d){delimiter}|{delimiter}(?!\d)")
+    return re.compile("|".join(alternatives), re.IGNORECASE)
+
+
+def strength_pattern(units: list[str]) -> re.Pattern:
+    """
+    Case-insensitive pattern matching strengths and concentrations ("0.5mg/1mg", "25 mg/ml",
+    "1%", "100 iu/ml") and the "w/w", "w/v", "v/v" qualifiers, so they can be removed before
+    names are split on "/". Plain ratios without units ("70/30") are not matched.
+    """
+    unit = rf"(?:{_alternation(units)})(?![a-z])" if units else r"(?!)"
+    number = r"\d+(?:[.,]\d+)?"
+    strength = rf"{number}\s*(?:%|{unit})(?:\s*/\s*(?:{number}\s*)?{unit})*"
+    return re.compile(rf"(?<![a-z0-9.,]){strength}|\b[wv]\s*/\s*[wv]\b", re.IGNORECASE)
+
+
+def remove_strengths(names: pd.Series, params: dict) -> pd.Series:
+    return names.str.replace(strength_pattern(params.get('strength_units', [])), " ", regex=True)
+
+
+def strip_salts(components: pd.Series, salt_tokens: list[str], counter_ions: list[str] = None) -> pd.Series:
+    """
+    Removes trailing salt, hydrate and ester tokens from each component, e.g.
+    "morphine sulfate pentahydrate" -> "morphine". Components where nothing but such tokens and
+    counter_ions (metals and cations such as "barium", "ferrous", "silver", radicals such as
+    "benzyl", anions such as "gadoterate") would be left are the active ingredient and are left
+    unchanged, so "sodium chloride", "barium sulfate" and "benzyl benzoate" keep their anion.
+    Neither is a component whose remainder is itself an inorganic salt, i.e. still contains a
+    counter ion ("ferric pyrophosphate citrate" is not "ferric pyrophosphate").
+    """
+    if not salt_tokens:
+        return components
+    tokens = _alternation(salt_tokens)
+    stripped = components.str.replace(rf"^(.*?\S)(?:\s+(?:{tokens}))+$", r"\1", regex=True)
+    kept = _alternation(salt_tokens + (counter_ions or []))
+    only_salts = stripped.str.fullmatch(rf"(?:{kept})(?:\s+(?:{kept}))*", na=False)
+    if counter_ions:
+        only_salts |= stripped.str.contains(rf"\b(?:{_alternation(counter_ions)})\b", regex=True, na=False)
+    return stripped.mask(only_salts, components)
+
+
+def clean_components(components: pd.Series, params: dict) -> pd.Series:
+    """
+    Moiety key of each (already lower-cased) combination component: punctuation and repeated
+    spaces removed and salt/hydrate/ester suffixes stripped.
+    """
+    components = (
+        components.str.replace(r"[^a-z0-9\-\s]", " ", regex=True)
+        .str.replace(r"\s+", " ", regex=True)
+        .str.strip(" -")
+    )
+    salt_tokens = params.get('salts', []) + params.get('hydrates', []) + params.get('esters', [])
+    return strip_salts(components, salt_tokens, params.get('counter_ions', []))
+
+
+def canonicalize_series(names: pd.Series, params: dict) -> pd.Series:
+    """
+    Maps ingredient strings to canonical keys: lower case, unicode and punctuation normalized,
+    single spaces, strengths and units removed, salt/hydrate/ester suffixes removed and
+    combination components sorted and
+    joined with "; ". "FENTANYL CITRATE", "fentanyl citrate " and "Fentanyl" all map to "fentanyl".
+
+    Args:
+        names (pd.Series): ingredient strings
+        params (dict): see ingredient_canonicalization in parameters.yml
+
+    Returns:
+        pd.Series: canonical keys, NaN where nothing is left of the input
+    """
+    text = (
+        names.reset_index(drop=True).astype("string")
+        .str.normalize("NFKC")
+        .str.lower()
+        .str.replace(r"[‐-―−]", "-", regex=True)
+    )
+    text = remove_strengths(text, params)
+    components = clean_components(text.str.split(delimiter_pattern(params['combination_delimiters'])).explode(), params)
+    components = components[components.fillna("") != ""]
+
+    keys = components.groupby(level=0).agg(lambda parts: "; ".join(sorted(set(parts))))
+    return pd.Series(keys.reindex(range(len(names))).to_numpy(dtype=object), index=names.index)
+
+
+def add_canonical_column(df: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """
+    Adds params['output_column'] with the canonical key of params['column'], so that every
+    surface form of an ingredient is resolved once downstream.
+    """
+    df[params['output_column']] = canonicalize_series(df[params['column']], params)
+    n_forms = df[params['column']].nunique()
+    n_keys = df[params['output_column']].nunique()
+    print(f"canonicalized {n_forms} ingredient strings to {n_keys} keys")
+    return df
@@ -0,0 +1,90 @@
+import sys
+import threading
+from collections import OrderedDict
+from functools import cache
+
+
+class CliqueCache:
+    """
+    In-memory LRU cache of NodeNorm results indexed by every member of the clique.
+
+    A NodeNorm response carries the full list of equivalent identifiers, so once one member
+    of a clique has been normalized, any other member (e.g. a PUBCHEM.COMPOUND id after the
+    CHEBI id of the same drug) can be answered without a new request. Cliques are evicted
+    least-recently-used first once their estimated size exceeds max_bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._cliques = OrderedDict()
+        self._index = {}
+        self._lock = threading.Lock()
+
+    def get(self, curie: str, flags: tuple = ()):
+        with self._lock:
+            clique_key = self._index.get((flags, curie))
+            if clique_key is None:
+                self.misses += 1
+                return None
+            self._cliques.move_to_end(clique_key)
+            self.hits += 1
+            return self._cliques[clique_key][0]
+
+    def put(self, curie: str, result: tuple, flags: tuple = ()):
+        """
+        Stores a successful (id, label, alternate ids) result under the clique id, the
+        requested curie and every equivalent identifier.
+        """
+        identifier, label, alt_ids = result
+        clique_key = (flags, identifier)
+        members = set(alt_ids) | {identifier, curie}
+        with self._lock:
+            if clique_key in self._cliques:
+                _, size, old_members = self._cliques.pop(clique_key)
+                self.size_bytes -= size
+                members |= old_members
+            size = _estimate_size(result, members)
+            self._cliques[clique_key] = (result, size, members)
+            self.size_bytes += size
+            for member in members:
+                self._index[(flags, member)] = clique_key
+            while self.size_bytes > self.max_bytes and len(self._cliques) > 1:
+                self._evict_oldest()
+
+    def _evict_oldest(self):
+        clique_key, (_, size, members) = self._cliques.popitem(last=False)
+        self.size_bytes -= size
+        for member in members:
+            if self._index.get((clique_key[0], member)) == clique_key:
+                del self._index[(clique_key[0], member)]
+        self.evictions += 1
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "cliques": len(self._cliques),
+            "size_mb": round(self.size_bytes / 2**20, 2),
+        }
+
+
+def _estimate_size(result: tuple, members: set) -> int:
+    identifier, label, alt_ids = result
+    size = sys.getsizeof(result) + sys.getsizeof(identifier) + sys.getsizeof(label) + sys.getsizeof(alt_ids)
+    size += sum(sys.getsizeof(item) for item in alt_ids)
+    # one index entry (key tuple + dict slot) per member
+    size += sum(sys.getsizeof(member) + 120 for member in members)
+    return size
+
+
+@cache
+def get_clique_cache(max_mb: float) -> CliqueCache:
+    """
+    Returns the process-wide clique cache, shared by every caller using the same size limit.
+    """
+    return CliqueCache(int(max_mb * 2**20))
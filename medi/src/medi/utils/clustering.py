@@ -0,0 +1,217 @@
+import re
+import zlib
+from collections import Counter, defaultdict
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+MERSENNE_PRIME = (1 << 61) - 1
+
+
+def prepare(text: str, params: dict) -> str:
+    """
+    Comparison form of a string: lower case, punctuation removed and ignore_tokens (dosage form
+    noise such as "inj") dropped within each ";"-separated component, and the components sorted
+    so reordered combinations compare equal. Word order inside a component is kept.
+    """
+    ignore = set(params.get('ignore_tokens') or [])
+    components = []
+    for component in str(text).lower().split(";"):
+        tokens = [token for token in re.sub(r"[^a-z0-9]+", " ", component).split() if token not in ignore]
+        if tokens:
+            components.append(" ".join(tokens))
+    return "; ".join(sorted(components))
+
+
+def shingles(text: str, n: int) -> set[str]:
+    padded = f" {text} "
+    return {padded[i:i + n] for i in range(max(len(padded) - n + 1, 1))}
+
+
+def jaccard(a: set, b: set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def minhash_signatures(shingle_sets: list[set[str]], num_perm: int, seed: int) -> np.ndarray:
+    """
+    Returns:
+        np.ndarray: (len(shingle_sets), num_perm) MinHash signatures
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.uint64)
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    for i, items in enumerate(shingle_sets):
+        hashes = np.array([zlib.crc32(item.encode("utf-8")) for item in items], dtype=np.uint64)
+        # (a * h + b) mod p; the product wraps around in uint64, as in datasketch
+        signatures[i] = ((np.outer(hashes, a) + b) % MERSENNE_PRIME).min(axis=0)
+    return signatures
+
+
+def lsh_candidates(signatures: np.ndarray, bands: int) -> dict[int, set[int]]:
+    """
+    Blocks strings by banded MinHash signatures: two strings become candidates if all rows of
+    at least one band agree.
+    """
+    rows = signatures.shape[1] // bands
+    candidates = defaultdict(set)
+    for band in range(bands):
+        buckets = defaultdict(list)
+        for i, key in enumerate(map(bytes, signatures[:, band * rows:(band + 1) * rows])):
+            buckets[key].append(i)
+        for members in buckets.values():
+            if len(members) > 1:
+                for i in members:
+                    candidates[i].update(members)
+    return candidates
+
+
+ROMAN_NUMERAL = re.compile(r"(?=[ivxlcdm])m{0,3}(cm|cd|d?c{0,3})(xc|xl|l?x{0,3})(ix|iv|v?i{0,3})")
+
+
+def edit_distance(a: str, b: str) -> int:
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+
+def is_typo(a: str, b: str, params: dict) -> bool:
+    """
+    Whether two different tokens are typo variants: both at least min_typo_chars long, within
+    max_typo_edits edits, and neither a prefix or suffix of the other (so "alglucosidase" is not
+    a typo of "avalglucosidase"). Single letters, roman numerals and numbers never are.
+    """
+    min_chars = params.get('min_typo_chars', 5)
+    for token in (a, b):
+        if len(token) < min_chars or token.isdigit() or ROMAN_NUMERAL.fullmatch(token):
+            return False
+    shorter, longer = sorted((a, b), key=len)
+    if longer.startswith(shorter) or longer.endswith(shorter):
+        return False
+    return edit_distance(a, b) <= params.get('max_typo_edits', 2)
+
+
+def component_compatible(a: str, b: str, params: dict) -> bool:
+    """
+    Whether two components have the same tokens, counted as a multiset, up to typos (see is_typo).
+    """
+    only_a = list((Counter(a.split()) - Counter(b.split())).elements())
+    only_b = list((Counter(b.split()) - Counter(a.split())).elements())
+    if len(only_a) != len(only_b):
+        return False
+    for token in only_a:
+        match = next((other for other in only_b if is_typo(token, other, params)), None)
+        if match is None:
+            return False
+        only_b.remove(match)
+    return True
+
+
+def tokens_compatible(a: str, b: str, params: dict) -> bool:
+    """
+    Whether two prepared strings may name the same product: they must have the same number of
+    ";"-separated components, and each component of one must pair with a component of the other
+    that has the same tokens up to typos. Tokens are never compared across components, so
+    "calcium chloride; sodium acetate" and "calcium acetate; sodium chloride" stay apart, as do
+    "factor viii" / "factor viia", "hepatitis a" / "hepatitis b" and "type a" / "type b".
+    """
+    components_a, components_b = a.split("; "), b.split("; ")
+    if len(components_a) != len(components_b):
+        return False
+    unmatched = list(components_b)
+    # exact components first, so a typo match cannot take another component's exact partner
+    for component in list(components_a):
+        if component in unmatched:
+            unmatched.remove(component)
+            components_a.remove(component)
+    for component in components_a:
+        match = next((other for other in unmatched if component_compatible(component, other, params)), None)
+        if match is None:
+            return False
+        unmatched.remove(match)
+    return True
+
+
+def cluster_strings(strings: list[str], params: dict) -> pd.DataFrame:
+    """
+    Groups near-identical strings (typos, dosage form suffixes, reordered components).
+
+    Candidates are found with MinHash LSH over character n-grams and then verified with the exact
+    n-gram Jaccard similarity. Clusters are built greedily around the shortest string, and a
+    string only joins a cluster if it is at least `threshold` similar to that representative (no
+    chaining), contains the same numbers (so "insulin 70 30" never merges with "insulin 50 50")
+    and differs from it only by typos within matching components (see tokens_compatible).
+
+    Returns:
+        pd.DataFrame: one row per string with its cluster_representative and cluster_similarity
+    """
+    prepared = [prepare(item, params) for item in strings]
+    shingle_sets = [shingles(item, params['ngram']) for item in prepared]
+    numbers = [tuple(sorted(re.findall(r"\d+", item))) for item in prepared]
+    signatures = minhash_signatures(shingle_sets, params['num_perm'], params['seed'])
+    candidates = lsh_candidates(signatures, params['bands'])
+
+    representative = [None] * len(strings)
+    similarity = [1.0] * len(strings)
+    for leader in tqdm(sorted(range(len(strings)), key=lambda i: (len(prepared[i]), strings[i])), desc="clustering"):
+        if representative[leader] is not None:
+            continue
+        representative[leader] = leader
+        if not prepared[leader]:
+            continue
+        for other in sorted(candidates.get(leader, ())):
+            if representative[other] is not None or numbers[other] != numbers[leader]:
+                continue
+            if not tokens_compatible(prepared[leader], prepared[other], params):
+                continue
+            score = jaccard(shingle_sets[leader], shingle_sets[other])
+            if score >= params['threshold']:
+                representative[other] = leader
+                similarity[other] = round(score, 3)
+
+    return pd.DataFrame({
+        'member': strings,
+        'cluster_representative': [strings[i] for i in representative],
+        'cluster_similarity': similarity,
+    })
+
+
+def cluster_column(df: pd.DataFrame, colname: str, params: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Args:
+        df (pd.DataFrame): dataframe with unique values in colname
+        colname (str): column to cluster
+        params (dict): see ingredient_clustering in parameters.yml
+
+    Returns:
+        tuple: the representative rows of df (one per cluster, to be resolved), and the cluster
+        map with colname, cluster_representative and cluster_similarity for every row
+    """
+    strings = df[colname].dropna().astype(str).unique().tolist()
+    if params.get('enabled', True):
+        clusters = cluster_strings(strings, params)
+    else:
+        clusters = pd.DataFrame({'member': strings, 'cluster_representative': strings, 'cluster_similarity': 1.0})
+    clusters = clusters.rename(columns={'member': colname})
+    representatives = df[df[colname].isin(clusters['cluster_representative'])].reset_index(drop=True)
+    print(f"{len(strings)} strings grouped into {len(representatives)} clusters at threshold {params['threshold']}")
+    return representatives, clusters
+
+
+def expand_clusters(resolved: pd.DataFrame, clusters: pd.DataFrame, colname: str) -> pd.DataFrame:
+    """
+    Propagates the results of each representative to all members of its cluster, keeping the
+    cluster_representative and cluster_similarity audit columns so merges can be reviewed.
+    """
+    resolved = resolved.rename(columns={colname: 'cluster_representative'})
+    expanded = clusters.merge(resolved, on='cluster_representative', how='inner', validate='many_to_one')
+    n_merged = (expanded[colname] != expanded['cluster_representative']).sum()
+    print(f"propagated results to {n_merged} clustered near-duplicates")
+    return expanded
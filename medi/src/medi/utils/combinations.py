@@ -0,0 +1,67 @@
+import re
+
+import pandas as pd
+
+from medi.utils import canonicalize
+
+
+def analyze_combinations(names: pd.Series, canonicalization_params: dict, params: dict) -> pd.DataFrame:
+    """
+    Rule-based combination therapy detection and splitting, vectorized over a column.
+
+    Strengths and units are removed (canonicalize.remove_strengths), names are split on the
+    combination delimiters of ingredient_canonicalization, and each component is reduced to its
+    moiety with the same salt/hydrate/ester dictionary, so two salts of one moiety ("fentanyl
+    citrate; fentanyl hydrochloride") are not a combination. Names joined from several lists
+    ("x| y") are checked alternative by alternative and must agree.
+
+    A name is left to the LLM (confident False) if it has a comma or one of
+    params['ambiguous_terms'] (multi-component vaccines, extracts), a component without a word
+    of at least params['min_component_chars'] letters, or alternatives that disagree.
+
+    Returns:
+        pd.DataFrame: aligned with names, with is_combination_therapy (None where not confident),
+        combination_therapy_ingredients ("|"-joined components, "" for single ingredients) and confident
+    """
+    text = names.reset_index(drop=True).astype("string").str.normalize("NFKC")
+    text = canonicalize.remove_strengths(text, canonicalization_params).str.replace(r"\s+", " ", regex=True)
+    alternatives = text.str.split(r"\s*\|\s*", regex=True).explode().str.strip()
+    alternatives = alternatives[alternatives.fillna("") != ""]
+    alternatives = alternatives.rename("alternative").rename_axis("row").reset_index()
+
+    components = alternatives['alternative'].str.split(canonicalize.delimiter_pattern(canonicalization_params['combination_delimiters'])).explode().str.strip()
+    components = components[components.fillna("") != ""]
+    moieties = canonicalize.clean_components(components.str.lower(), canonicalization_params)
+
+    terms = "|".join(re.escape(term) for term in params.get('ambiguous_terms', []))
+    ambiguous = alternatives['alternative'].str.contains(",", regex=False)
+    if terms:
+        ambiguous |= alternatives['alternative'].str.contains(rf"\b(?:{terms})\b", case=False, regex=True)
+    # every component needs one alphabetic word of min_component_chars, so fragments such as "w"
+    # or "ml" left by an unrecognized strength never count as ingredients
+    longest_word = moieties.str.findall(r"[a-z]+").map(lambda words: max(map(len, words), default=0))
+    short = longest_word < params.get('min_component_chars', 3)
+    ambiguous |= short.groupby(level=0).any().reindex(alternatives.index, fill_value=True)
+
+    # keep the first surface form of each moiety, in the order given
+    unique = components[~pd.DataFrame({'alt': components.index, 'moiety': moieties.values}).duplicated().values]
+    alternatives['n_moieties'] = moieties.groupby(level=0).nunique().reindex(alternatives.index, fill_value=0)
+    alternatives['split'] = unique.groupby(level=0).agg("|".join).reindex(alternatives.index, fill_value="")
+    alternatives['is_combination'] = alternatives['n_moieties'] >= 2
+    alternatives['ambiguous'] = ambiguous | (alternatives['n_moieties'] == 0)
+
+    rows = alternatives.groupby('row').agg(
+        ambiguous=('ambiguous', 'any'),
+        n_combination=('is_combination', 'sum'),
+        n_alternatives=('is_combination', 'size'),
+    )
+    combination_split = alternatives[alternatives['is_combination']].groupby('row')['split'].first()
+    rows['confident'] = ~rows['ambiguous'] & ((rows['n_combination'] == 0) | (rows['n_combination'] == rows['n_alternatives']))
+    rows = rows.reindex(range(len(names)))
+    confident = rows['confident'].fillna(False).astype(bool)
+
+    result = pd.DataFrame(index=range(len(names)))
+    result['is_combination_therapy'] = (rows['n_combination'] > 0).astype(object).where(confident, None)
+    result['combination_therapy_ingredients'] = combination_split.reindex(range(len(names))).fillna("")
+    result['confident'] = confident
+    return result.set_axis(names.index)
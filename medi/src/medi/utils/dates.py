@@ -0,0 +1,99 @@
+import re
+
+import pandas as pd
+
+from medi.utils import openai_tags
+
+# tried in order, so day-first formats win over month-first ones for ambiguous numeric dates
+DEFAULT_FORMATS = [
+    "%Y%m%d",
+    "%Y-%m-%d",
+    "%d/%m/%Y",
+    "%d.%m.%Y",
+    "%d-%m-%Y",
+    "%Y/%m/%d",
+    "%d/%m/%y",
+    "%d-%b-%y",
+    "%d-%b-%Y",
+    "%d %b %Y",
+    "%d %B %Y",
+    "%b %d, %Y",
+    "%B %d, %Y",
+    "%b %Y",
+    "%B %Y",
+    "%Y",
+]
+
+DEFAULT_SENTINELS = {
+    "approved prior to jan 1, 1982": "19820101",
+}
+
+
+def clean_dates(values: pd.Series) -> pd.Series:
+    """
+    Normalizes date strings before parsing: whitespace collapsed, "Mar." -> "Mar", "Sept" -> "Sep"
+    and numbers read from Excel as floats ("19760101.0") restored.
+    """
+    text = values.astype("string").str.strip()
+    text = text.str.replace(r"\s+", " ", regex=True)
+    text = text.str.replace(r"\b([A-Za-z]{3,4})\.", r"\1", regex=True)
+    text = text.str.replace(r"\bSept\b", "Sep", regex=True, flags=re.IGNORECASE)
+    text = text.str.replace(r"^(\d+)\.0$", r"\1", regex=True)
+    return text
+
+
+def parse_dates(values: pd.Series, params: dict = None) -> pd.Series:
+    """
+    Parses approval dates written in any of params['formats'] (see date_parsing in
+    parameters.yml) into YYYYMMDD strings. Each distinct value is parsed once, one vectorized
+    pd.to_datetime pass per format over the values still unparsed. Two-digit years that would
+    land in the future are moved back a century, and year-only values become January 1.
+
+    Returns:
+        pd.Series: YYYYMMDD strings aligned with values, missing where no format matched
+    """
+    params = params or {}
+    formats = params.get('formats') or DEFAULT_FORMATS
+    sentinels = {key.lower(): value for key, value in (params.get('sentinels') or DEFAULT_SENTINELS).items()}
+
+    unique = pd.Series(values.dropna().unique())
+    text = clean_dates(unique)
+    parsed = text.str.lower().map(sentinels).astype(object)
+    today = pd.Timestamp.today()
+    for date_format in formats:
+        todo = parsed.isna() & text.notna() & (text != "")
+        if not todo.any():
+            break
+        dates = pd.to_datetime(text[todo], format=date_format, errors='coerce')
+        if "%y" in date_format:
+            dates = dates.where(dates <= today, dates - pd.DateOffset(years=100))
+        dates = dates.dropna()
+        parsed[dates.index] = dates.dt.strftime('%Y%m%d')
+
+    lookup = dict(zip(unique, parsed.where(parsed.notna(), None)))
+    return values.map(lookup).astype(object).where(values.notna(), None)
+
+
+def reformat_dates(df: pd.DataFrame, params: dict, fallback_params: dict = None) -> pd.DataFrame:
+    """
+    Reformats params['column'] to YYYYMMDD with parse_dates. Only the distinct values that no
+    format matches are sent to the LLM with the date_reformatting_tag prompt; answers that are not
+    8 digits become XXXXXXXX, as the prompt asks for undeterminable dates.
+    """
+    column = params['column']
+    parsed = parse_dates(df[column], params)
+    residue = df.loc[parsed.isna() & df[column].notna(), column].astype(str).str.strip()
+    residue = [value for value in residue.unique() if value]
+    print(f"{column}: {parsed.notna().sum()} of {len(df)} dates parsed, {len(residue)} distinct values left for the LLM")
+
+    fallback = {}
+    for value in residue:
+        answer = "XXXXXXXX"
+        if fallback_params:
+            model_params = fallback_params['model_params']
+            output = openai_tags.single_openai_prompt(f"{model_params['prompt']}{value}", model=model_params['model'], temperature=model_params['temperature'])
+            if isinstance(output, str) and re.fullmatch(r"\d{8}", output.strip()):
+                answer = output.strip()
+        fallback[value] = answer
+    df[column] = parsed.where(parsed.notna(), df[column].astype(str).str.strip().map(fallback))
+    return df
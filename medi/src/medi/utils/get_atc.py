@@ -1,4 +1,3 @@
-import requests
 import xml.etree.ElementTree as ET
 from tqdm import tqdm
 import pandas as pd
@@ -6,6 +5,7 @@ from concurrent.futures import ThreadPoolExecutor
 import ast
 import re
 from urllib.parse import quote
+from medi.utils import http_client, journal
 
 
 def get_atc_from_rxnorm(rxnorm_id):
@@ -16,7 +16,7 @@ def get_atc_from_rxnorm(rxnorm_id):
             return None
             
         # Call the RxNav API to get ATC codes
-        response = requests.get(f"https://rxnav.nlm.nih.gov/REST/rxcui/{rxnorm_id}/property?propName=ATC")
+        response = http_client.get_client().get(f"https://rxnav.nlm.nih.gov/REST/rxcui/{rxnorm_id}/property?propName=ATC")
         
         if response.status_code == 200:
             data = response.json()
@@ -38,7 +38,7 @@ def get_atc_from_chebi(chebi_id):
             chebi_id = chebi_id.split(':')[1]
         
         # Call the ChEBI API
-        response = requests.get(f"https://www.ebi.ac.uk/webservices/chebi/2.0/test/getCompleteEntity?chebiId={chebi_id}")
+        response = http_client.get_client().get(f"https://www.ebi.ac.uk/webservices/chebi/2.0/test/getCompleteEntity?chebiId={chebi_id}")
         
         if response.status_code == 200:
             # Parse the XML response
@@ -64,7 +64,7 @@ def get_atc_from_chembl(chembl_id):
             chembl_id = chembl_id.split(':')[1]
         
         # Call the ChEMBL API
-        response = requests.get(f"https://www.ebi.ac.uk/chembl/api/data/molecule/{chembl_id}.json")
+        response = http_client.get_client().get(f"https://www.ebi.ac.uk/chembl/api/data/molecule/{chembl_id}.json")
         
         if response.status_code == 200:
             data = response.json()
@@ -83,7 +83,7 @@ def get_atc_from_pubchem(pubchem_id):
             pubchem_id = pubchem_id.split(':')[1]
             
         # The PubChem API doesn't directly provide ATC codes, so we'll use the classification browser
-        response = requests.get(f"https://pubchem.ncbi.nlm.nih.gov/rest/pug_view/data/compound/{pubchem_id}/JSON")
+        response = http_client.get_client().get(f"https://pubchem.ncbi.nlm.nih.gov/rest/pug_view/data/compound/{pubchem_id}/JSON")
         
         if response.status_code == 200:
             data = response.json()
@@ -118,7 +118,7 @@ def get_atc_from_drugcentral(drugcentral_id):
             drugcentral_id = drugcentral_id.split(':')[1]
             
         # Call the DrugCentral API
-        response = requests.get(f"https://drugcentral.org/api/drugcentral/structures?q={drugcentral_id}")
+        response = http_client.get_client().get(f"https://drugcentral.org/api/drugcentral/structures?q={drugcentral_id}")
         
         if response.status_code == 200:
             data = response.json()
@@ -141,7 +141,7 @@ def get_atc_from_whocc(drug_name):
         encoded_name = quote(drug_name)
         
         # Search the WHO ATC database
-        response = requests.get(f"https://www.whocc.no/atc_ddd_index/?name={encoded_name}")
+        response = http_client.get_client().get(f"https://www.whocc.no/atc_ddd_index/?name={encoded_name}")
         
         if response.status_code == 200:
             # Parse HTML response to extract ATC codes
@@ -179,7 +179,7 @@ def get_chebi_drugcentral_xrefs(chebi_id):
             chebi_num = chebi_id
             
         # Use the EBI OLS API to get cross-references
-        response = requests.get(f"https://www.ebi.ac.uk/ols/api/ontologies/chebi/terms/http%253A%252F%252Fpurl.obolibrary.org%252Fobo%252FCHEBI_{chebi_num}")
+        response = http_client.get_client().get(f"https://www.ebi.ac.uk/ols/api/ontologies/chebi/terms/http%253A%252F%252Fpurl.obolibrary.org%252Fobo%252FCHEBI_{chebi_num}")
         
         if response.status_code == 200:
             data = response.json()
@@ -284,18 +284,29 @@ def get_atc_codes_for_dataframe(df, atc_standard, max_workers=5):
     # Make a copy to avoid modifying the original
     result_df = df.copy()
     
+    # Rows with codes found by an earlier, interrupted run are read back from the journal. Rows
+    # without codes are not journaled, since the lookups swallow request errors as "no code"
+    checkpoint = journal.open_journal("get_atc_codes", df[['corrected_curie_norm', 'alternate_ids']], atc_standard_dict_id_to_code)
+    row_keys = [journal.row_key(row['corrected_curie_norm'], row['alternate_ids']) for _, row in df.iterrows()]
+    atc_codes = [None] * len(df)
+
     # Process rows in parallel for efficiency
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
         # Submit all jobs
-        future_to_index = {executor.submit(get_atc_for_row, row, atc_standard_dict_id_to_code): i 
-                          for i, row in df.iterrows()}
+        future_to_index = {}
+        for i, row in df.iterrows():
+            if row_keys[i] in checkpoint:
+                atc_codes[i] = checkpoint[row_keys[i]]
+            else:
+                future_to_index[executor.submit(get_atc_for_row, row, atc_standard_dict_id_to_code)] = i
         
         # Collect results
-        atc_codes = [None] * len(df)
         for future in tqdm(future_to_index):
             index = future_to_index[future]
             try:
                 atc_codes[index] = future.result()
+                if atc_codes[index]:
+                    checkpoint.record(row_keys[index], atc_codes[index])
             except Exception as e:
                 print(f"Error processing row {index}: {str(e)}")
                 atc_codes[index] = None
@@ -2,6 +2,7 @@ from tqdm import tqdm
 import pandas as pd
 import requests
 from typing import Optional
+from medi.utils import http_client
 
 def string_to_list(input_string):
     """
@@ -95,7 +96,7 @@ def get_smiles_from_pubchem(pubchem_id: int) -> Optional[str]:
     endpoint = f"{base_url}/compound/cid/{pubchem_id}/property/IsomericSMILES/JSON"
     try:
         # Make the API request
-        response = requests.get(endpoint)
+        response = http_client.get_client().get(endpoint)
         response.raise_for_status()  # Raise an exception for bad status codes
         
         # Parse the JSON response
@@ -0,0 +1,225 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+DEFAULT_PARAMS = {
+    "pool_maxsize": 20,
+    "timeout": 30,
+    "max_retries": 5,
+    "backoff_base": 1,
+    "backoff_max": 60,
+    "default_rate_per_second": 10,
+    "circuit_breaker": {
+        "failure_threshold": 5,
+        "reset_seconds": 120,
+    },
+    "hosts": {},
+}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to a host whose circuit breaker is open."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing `rate` requests per second with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failed requests and fails fast until
+    `reset_seconds` have passed, after which a single trial request is let through (half-open):
+    the breaker closes if it succeeds and re-opens if it fails. A trial that never reports back
+    is replaced by a new one after another `reset_seconds`.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            now = time.monotonic()
+            if self.probe_started is not None:
+                if now - self.probe_started < self.reset_seconds:
+                    return False
+            elif now - self.opened_at < self.reset_seconds:
+                return False
+            # half-open: this request is the only one let through until it reports back
+            self.probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started = None
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.probe_started is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self.probe_started = None
+
+
+class HttpClient:
+    """
+    Shared HTTP client for all external lookups (NodeNorm, NameRes, PubChem, ChEMBL, ...).
+
+    Uses one pooled keep-alive session, a token bucket and circuit breaker per host, and
+    retries transient failures with exponential backoff, honoring Retry-After headers.
+    """
+
+    def __init__(self, params: dict = None):
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.params['pool_maxsize'],
+            pool_maxsize=self.params['pool_maxsize'],
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._buckets = {}
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def _host_params(self, host: str) -> dict:
+        return (self.params.get('hosts') or {}).get(host) or {}
+
+    def _bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            if host not in self._buckets:
+                host_params = self._host_params(host)
+                rate = host_params.get('rate_per_second', self.params['default_rate_per_second'])
+                self._buckets[host] = TokenBucket(rate, host_params.get('burst'))
+            return self._buckets[host]
+
+    def _breaker(self, host: str) -> CircuitBreaker:
+        with self._lock:
+            if host not in self._breakers:
+                breaker_params = {**DEFAULT_PARAMS['circuit_breaker'], **self.params.get('circuit_breaker', {})}
+                self._breakers[host] = CircuitBreaker(breaker_params['failure_threshold'], breaker_params['reset_seconds'])
+            return self._breakers[host]
+
+    def _backoff(self, attempt: int, response: requests.Response = None) -> float:
+        if response is not None and response.headers.get('Retry-After'):
+            retry_after = response.headers['Retry-After']
+            try:
+                return min(float(retry_after), self.params['backoff_max'])
+            except ValueError:
+                try:
+                    delay = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                    return min(max(delay, 0), self.params['backoff_max'])
+                except (TypeError, ValueError):
+                    pass
+        delay = self.params['backoff_base'] * 2 ** attempt
+        return min(delay, self.params['backoff_max']) * random.uniform(0.5, 1)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Sends a request, retrying connection errors and 429/5xx responses.
+
+        Returns:
+            requests.Response: the final response. Non-retryable error statuses are returned
+            as-is so callers can inspect status_code.
+
+        Raises:
+            CircuitOpenError: if the host's circuit breaker is open
+            requests.RequestException: if the request still fails after all retries
+        """
+        host = urlparse(url).netloc
+        breaker = self._breaker(host)
+        bucket = self._bucket(host)
+        kwargs.setdefault('timeout', self.params['timeout'])
+        if kwargs['timeout'] is None:
+            kwargs['timeout'] = self.params['timeout']
+
+        if not breaker.allow():
+            raise CircuitOpenError(f"circuit open for {host}, not sending request to {url}")
+        attempt = 0
+        while True:
+            bucket.acquire()
+            response = None
+            try:
+                response = self.session.request(method, url, **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} from {url}", response=response)
+            except requests.RequestException as e:
+                error = e
+            if attempt >= self.params['max_retries']:
+                # one failure per request once its retries are exhausted, so a single bad request
+                # cannot open the breaker; rate limiting means the host is up
+                if response is not None and response.status_code == 429:
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                if response is not None:
+                    return response
+                raise error
+            time.sleep(self._backoff(attempt, response))
+            attempt += 1
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure(params: dict) -> HttpClient:
+    """
+    Replaces the shared client with one built from params (http_client_params in parameters.yml).
+    """
+    global _client
+    with _client_lock:
+        _client = HttpClient(params)
+    return _client
+
+
+def get_client() -> HttpClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
@@ -0,0 +1,82 @@
+import json
+
+import pandas as pd
+
+from medi.utils import journal
+
+
+def tag_hashes(df: pd.DataFrame, tags: dict, labels_col: str) -> pd.DataFrame:
+    """
+    Hash of the inputs of every (drug, tag) pair: the label sent to the model and the tag's
+    prompt, model and temperature.
+
+    Returns:
+        pd.DataFrame: aligned with df, one column per tag output_col
+    """
+    hashes = pd.DataFrame(index=df.index)
+    for tag in tags.values():
+        model_params = tag['model_params']
+        hashes[tag['output_col']] = [
+            journal.row_key(str(label), model_params['prompt'], model_params['model'], model_params['temperature'])[:16]
+            for label in df[labels_col]
+        ]
+    return hashes
+
+
+def parse_hashes(value) -> dict:
+    if isinstance(value, dict):
+        return value
+    try:
+        parsed = json.loads(value)
+    except (TypeError, ValueError):
+        return {}
+    return parsed if isinstance(parsed, dict) else {}
+
+
+def store_hashes(df: pd.DataFrame, hashes: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """
+    Merges hashes into the JSON column params['hash_column'], so that the next release can tell
+    which flags were computed from the same inputs.
+    """
+    column = params.get('hash_column', 'enrichment_hashes')
+    existing = df[column].map(parse_hashes) if column in df.columns else pd.Series([{}] * len(df), index=df.index)
+    df[column] = [
+        json.dumps({**old, **new}, sort_keys=True)
+        for old, new in zip(existing, hashes.to_dict(orient='records'))
+    ]
+    return df
+
+
+def carry_forward(df: pd.DataFrame, old_list: pd.DataFrame, tags: dict, labels_col: str, params: dict) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Looks up every drug of df in the previous release (see incremental_tagging in
+    parameters.yml) on params['key_column'], and carries a flag forward when the previous
+    release stored the same input hash for it: same label, same prompt, same model.
+
+    Returns:
+        tuple: the carried flags (None where the tag has to be recomputed) and the current hashes,
+        both aligned with df with one column per tag output_col
+    """
+    hashes = tag_hashes(df, tags, labels_col)
+    carried = pd.DataFrame(None, index=df.index, columns=hashes.columns, dtype=object)
+    hash_column = params.get('hash_column', 'enrichment_hashes')
+    old_columns = old_list.columns if old_list is not None else []
+    old_key = next((column for column in params.get('old_key_columns', []) if column in old_columns), None)
+    if old_key is None or hash_column not in old_columns:
+        print("incremental tagging: previous release has no stored hashes, tagging every drug")
+        return carried, hashes
+
+    previous = old_list.dropna(subset=[old_key]).drop_duplicates(old_key).set_index(old_key)
+    keys = df[params['key_column']]
+    previous_hashes = previous[hash_column].map(parse_hashes).reindex(keys).tolist()
+    for output_col in hashes.columns:
+        if output_col not in previous.columns:
+            continue
+        previous_values = previous[output_col].reindex(keys).to_numpy()
+        unchanged = [
+            isinstance(stored, dict) and stored.get(output_col) == current and pd.notna(value)
+            for stored, current, value in zip(previous_hashes, hashes[output_col], previous_values)
+        ]
+        carried[output_col] = pd.Series(previous_values, index=df.index, dtype=object).where(unchanged, None)
+        print(f"{output_col}: {sum(unchanged)} of {len(df)} flags carried forward from the previous release")
+    return carried, hashes
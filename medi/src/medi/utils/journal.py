@@ -0,0 +1,87 @@
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+
+_params = None
+
+
+def configure(params: dict):
+    """
+    Sets the journal location from params (journal_params in parameters.yml). Journaling is
+    off when params are missing or enabled is false.
+    """
+    global _params
+    _params = params if params and params.get('enabled', True) else None
+
+
+def hash_inputs(*inputs) -> str:
+    """
+    Hash of a node's inputs; dataframes are hashed by content, anything else by its JSON form.
+    """
+    digest = hashlib.sha256()
+    for item in inputs:
+        if isinstance(item, pd.DataFrame):
+            digest.update(pd.util.hash_pandas_object(item.astype(str), index=False).values.tobytes())
+            digest.update(json.dumps(list(map(str, item.columns))).encode("utf-8"))
+        else:
+            digest.update(json.dumps(item, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def row_key(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class Journal:
+    """
+    Append-only JSONL checkpoint of the rows a node has completed, for one set of node inputs.
+
+    Nodes record each row's result as soon as it arrives; when the node is re-run on the same
+    inputs after a crash, completed rows are read back and only the missing or failed ones are
+    computed again. A disabled journal (path None) remembers nothing.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = path
+        self.entries = {}
+        self._lock = threading.Lock()
+        if path is None:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # a crash can leave the last line half-written
+                        continue
+                    self.entries[entry['key']] = entry['value']
+            print(f"resuming from {len(self.entries)} journaled rows in {path}")
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def __getitem__(self, key: str):
+        return self.entries[key]
+
+    def record(self, key: str, value):
+        if self.path is None:
+            return
+        line = json.dumps({"key": key, "value": value}, default=str) + "\n"
+        with self._lock:
+            self.entries[key] = value
+            with open(self.path, "a") as f:
+                f.write(line)
+
+
+def open_journal(node: str, *inputs) -> Journal:
+    """
+    Returns the journal of `node` for these inputs (a disabled journal if journaling is off).
+    """
+    if _params is None:
+        return Journal()
+    return Journal(os.path.join(_params['dir'], node, hash_inputs(*inputs) + ".jsonl"))
@@ -0,0 +1,71 @@
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from medi.utils import canonicalize
+
+
+def tfidf_cosine(left: pd.Series, right: pd.Series, ngram_range: tuple = (2, 4)) -> np.ndarray:
+    """
+    Row-wise cosine similarity of character n-gram TF-IDF vectors, fitted on both columns.
+    """
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=tuple(ngram_range))
+    vectorizer.fit(pd.concat([left, right]))
+    # rows are L2-normalized, so the row-wise dot product is the cosine
+    return np.asarray(vectorizer.transform(left).multiply(vectorizer.transform(right)).sum(axis=1)).ravel()
+
+
+def edit_similarity(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b).ratio() if a or b else 1.0
+
+
+def token_set_ratio(a: str, b: str) -> float:
+    """
+    Token set ratio (as in fuzzywuzzy, scaled to 0-1): the shared tokens are compared with each
+    side's full token set, so "codeine; acetaminophen" and "acetaminophen and codeine" score 1.
+    """
+    tokens_a, tokens_b = set(a.replace(";", " ").split()), set(b.replace(";", " ").split())
+    shared = " ".join(sorted(tokens_a & tokens_b))
+    only_a = (shared + " " + " ".join(sorted(tokens_a - tokens_b))).strip()
+    only_b = (shared + " " + " ".join(sorted(tokens_b - tokens_a))).strip()
+    return max(edit_similarity(shared, only_a), edit_similarity(shared, only_b), edit_similarity(only_a, only_b)) if shared else edit_similarity(only_a, only_b)
+
+
+def score_pairs(left: pd.Series, right: pd.Series, canonicalization_params: dict, params: dict) -> pd.DataFrame:
+    """
+    Scores each (source string, resolved label) pair after canonicalization (case, punctuation,
+    salt forms, component order). Each distinct pair is scored once.
+
+    Returns:
+        pd.DataFrame: aligned with left, with exact (canonical keys equal), tfidf and token_set
+    """
+    pairs = pd.DataFrame({
+        'left': canonicalize.canonicalize_series(left, canonicalization_params).fillna("").to_numpy(),
+        'right': canonicalize.canonicalize_series(right, canonicalization_params).fillna("").to_numpy(),
+    })
+    unique = pairs.drop_duplicates().reset_index(drop=True)
+    unique['exact'] = (unique['left'] == unique['right']) & (unique['left'] != "")
+    unique['tfidf'] = tfidf_cosine(unique['left'], unique['right'], params.get('ngram_range', (2, 4))) if len(unique) else []
+    unique['token_set'] = [token_set_ratio(a, b) for a, b in zip(unique['left'], unique['right'])]
+    scores = pairs.merge(unique, on=['left', 'right'], how='left')
+    return scores[['exact', 'tfidf', 'token_set']].set_axis(left.index)
+
+
+def classify_pairs(scores: pd.DataFrame, params: dict) -> pd.DataFrame:
+    """
+    Accepts pairs that are exact or where both scores reach accept_threshold, rejects pairs where
+    both are below reject_threshold, and leaves the band in between undecided.
+
+    Returns:
+        pd.DataFrame: decision (True, False or None) and method ("exact", "lexical_accept",
+        "lexical_reject" or "llm") per pair
+    """
+    accept = scores['exact'] | (scores[['tfidf', 'token_set']].min(axis=1) >= params['accept_threshold'])
+    reject = ~accept & (scores[['tfidf', 'token_set']].max(axis=1) < params['reject_threshold'])
+    method = np.select([scores['exact'], accept, reject], ["exact", "lexical_accept", "lexical_reject"], "llm")
+    decision = pd.Series([None] * len(scores), index=scores.index, dtype=object)
+    decision[accept] = True
+    decision[reject] = False
+    return pd.DataFrame({'decision': decision, 'method': method}, index=scores.index)
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import time
+
+from openai import OpenAI
+from tqdm import tqdm
+
+from medi.utils import llm_cache
+
+TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+ROLES = {"human": "user", "ai": "assistant"}
+
+
+def batch_enabled(params: dict) -> bool:
+    return bool(params) and bool(params.get('enabled'))
+
+
+def chat_body(messages: list, model: str, temperature=None, response_format=None) -> dict:
+    """
+    Args:
+        messages (list): (role, content) pairs; LangChain message types ("human", "ai") are accepted
+
+    Returns:
+        dict: request body for /v1/chat/completions
+    """
+    body = {
+        "model": model,
+        "messages": [{"role": ROLES.get(role, role), "content": content} for role, content in messages],
+    }
+    if temperature is not None:
+        body["temperature"] = temperature
+    if response_format is not None:
+        body["response_format"] = response_format
+    return body
+
+
+class BatchJob:
+    """
+    One offline batch job for a fixed set of requests.
+
+    The job state (uploaded file id, batch id, status) is persisted in state_dir under the hash
+    of the request file, so a run that is interrupted while the job is in progress picks the same
+    job up again instead of resubmitting it, and a completed job's output is reused as-is.
+    """
+
+    def __init__(self, lines: list[dict], params: dict):
+        self.params = params
+        self.client = OpenAI(base_url=params.get('base_url'))
+        self.payload = "".join(json.dumps(line, sort_keys=True) + "\n" for line in lines)
+        self.input_hash = hashlib.sha256(self.payload.encode("utf-8")).hexdigest()
+        os.makedirs(params['state_dir'], exist_ok=True)
+        prefix = os.path.join(params['state_dir'], self.input_hash)
+        self.input_path = prefix + ".input.jsonl"
+        self.state_path = prefix + ".state.json"
+        self.output_path = prefix + ".output.jsonl"
+
+    def _load_state(self) -> dict:
+        if not os.path.exists(self.state_path):
+            return {}
+        with open(self.state_path) as f:
+            return json.load(f)
+
+    def _save_state(self, state: dict):
+        with open(self.state_path, "w") as f:
+            json.dump(state, f)
+
+    def submit(self) -> dict:
+        with open(self.input_path, "w") as f:
+            f.write(self.payload)
+        with open(self.input_path, "rb") as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window=self.params.get('completion_window', "24h"),
+        )
+        state = {"input_hash": self.input_hash, "input_file_id": input_file.id, "batch_id": batch.id, "status": batch.status}
+        self._save_state(state)
+        print(f"submitted batch {batch.id}")
+        return state
+
+    def wait(self, state: dict):
+        while True:
+            batch = self.client.batches.retrieve(state['batch_id'])
+            state.update(status=batch.status, output_file_id=batch.output_file_id, error_file_id=batch.error_file_id)
+            self._save_state(state)
+            if batch.status in TERMINAL_STATUSES:
+                return batch
+            counts = batch.request_counts
+            print(f"batch {batch.id}: {batch.status} ({counts.completed if counts else '?'}/{counts.total if counts else '?'})")
+            time.sleep(self.params.get('poll_seconds', 60))
+
+    def run(self) -> dict:
+        """
+        Only a completed job's output is kept in state_dir and reused by later runs. A job that
+        ends as failed, expired or cancelled returns whatever partial output it has, and its state
+        is cleared so the next run submits the requests again.
+
+        Returns:
+            dict: custom_id -> message content for every request that succeeded
+        """
+        if os.path.exists(self.output_path):
+            with open(self.output_path) as f:
+                return parse_output(f.read())
+        state = self._load_state()
+        if state.get('batch_id'):
+            print(f"resuming batch {state['batch_id']} ({state.get('status')})")
+        else:
+            state = self.submit()
+        batch = self.wait(state)
+        output = self.client.files.content(batch.output_file_id).text if batch.output_file_id else ""
+        if batch.status == "completed":
+            with open(self.output_path, "w") as f:
+                f.write(output)
+        else:
+            print(f"batch {batch.id} ended as {batch.status}, using partial results and resubmitting on the next run")
+            os.remove(self.state_path)
+        return parse_output(output)
+
+
+def parse_output(output: str) -> dict:
+    results = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        item = json.loads(line)
+        response = item.get('response') or {}
+        if response.get('status_code') != 200:
+            continue
+        try:
+            results[item['custom_id']] = response['body']['choices'][0]['message']['content']
+        except (KeyError, IndexError, TypeError):
+            continue
+    return results
+
+
+def run_chat_batch(requests: list[tuple], params: dict, description: str = "batch", validate=None) -> list:
+    """
+    Runs chat completion requests as offline batch jobs, answering from the LLM cache first and
+    caching every result. Requests are identified by their LLM cache key (custom_id), so results
+    are merged back regardless of the order they come back in.
+
+    Args:
+        requests (list[tuple]): (messages, model, temperature, response_format) per request
+        params (dict): see llm_batch_params in parameters.yml
+        validate (callable, optional): only results passing validate(content) are cached
+
+    Returns:
+        list: response content per request, None where the batch did not return a result
+    """
+    cache = llm_cache.get_cache()
+    keys = [llm_cache.make_key("openai", model, temperature, messages, response_format) for messages, model, temperature, response_format in requests]
+    contents = [cache.get(key) if cache is not None else None for key in keys]
+
+    pending = {}
+    for key, content, request in zip(keys, contents, requests):
+        if content is None:
+            pending.setdefault(key, chat_body(*request))
+    print(f"{description}: {len(requests) - sum(content is None for content in contents)} of {len(requests)} answered from cache, {len(pending)} to batch")
+
+    lines = [{"custom_id": key, "method": "POST", "url": "/v1/chat/completions", "body": body} for key, body in pending.items()]
+    results = {}
+    size = params.get('max_requests_per_batch', 50000)
+    for start in tqdm(range(0, len(lines), size), desc=f"{description} batches"):
+        results.update(BatchJob(lines[start:start + size], params).run())
+
+    for i, key in enumerate(keys):
+        if contents[i] is None and key in results:
+            contents[i] = results[key]
+            if cache is not None and (validate is None or validate(results[key])):
+                cache.set(key, results[key], "openai", requests[i][1])
+    print(f"{description}: {sum(content is None for content in contents)} requests without a batch result")
+    return contents
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class LLMCache:
+    """
+    Persistent, content-addressed cache of LLM responses stored in a local SQLite file.
+
+    Responses are keyed on everything that determines them (provider, model, temperature, full
+    message list, response format), so identical prompts are never sent twice across runs.
+    Once the stored responses exceed max_bytes, the least recently used ones are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                provider TEXT NOT NULL,
+                model TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL,
+                size INTEGER NOT NULL,
+                value TEXT NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS llm_responses_last_used ON llm_responses (last_used)")
+        self._conn.commit()
+        self.size_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_responses").fetchone()[0]
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE llm_responses SET last_used = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+            return row[0]
+
+    def set(self, key: str, value: str, provider: str, model: str):
+        size = len(key) + len(value.encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM llm_responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, provider, model, created_at, last_used, size, value) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, provider, model, now, now, size, value),
+            )
+            self.size_bytes += size - (old[0] if old else 0)
+            if self.size_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        # evict down to 90% of the limit so we don't evict on every insert once full
+        target = self.max_bytes * 0.9
+        for key, size in self._conn.execute("SELECT key, size FROM llm_responses ORDER BY last_used").fetchall():
+            if self.size_bytes <= target:
+                break
+            self._conn.execute("DELETE FROM llm_responses WHERE key = ?", (key,))
+            self.size_bytes -= size
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size_mb": round(self.size_bytes / 2**20, 2),
+        }
+
+
+def make_key(provider: str, model: str, temperature, messages: list, response_format=None, **options) -> str:
+    """
+    Args:
+        messages (list): the full message list sent, as (role, content) pairs or plain strings
+        options: any other request settings that change the response (e.g. generation config)
+
+    Returns:
+        str: sha256 of the canonical JSON encoding of the request
+    """
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "temperature": temperature,
+            "messages": messages,
+            "response_format": response_format,
+            "options": options,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def configure(params: dict):
+    """
+    Opens the shared cache from params (llm_cache_params in parameters.yml). Caching is off
+    when params are missing or enabled is false.
+    """
+    global _cache
+    with _cache_lock:
+        if not params or not params.get('enabled', True):
+            _cache = None
+        else:
+            _cache = LLMCache(params['path'], int(params['max_mb'] * 2**20))
+    return _cache
+
+
+def get_cache():
+    return _cache
+
+
+def cached_completion(call, provider: str, model: str, temperature, messages: list, response_format=None, **options) -> str:
+    """
+    Returns the cached response text for this request, or runs call() and caches its result.
+    Exceptions raised by call() propagate and nothing is cached.
+    """
+    cache = get_cache()
+    if cache is None:
+        return call()
+    key = make_key(provider, model, temperature, messages, response_format, **options)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    value = call()
+    if value is not None:
+        cache.set(key, value, provider, model)
+    return value
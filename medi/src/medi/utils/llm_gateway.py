@@ -0,0 +1,194 @@
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from medi.utils.http_client import TokenBucket
+
+DEFAULT_PARAMS = {
+    "max_retries": 6,
+    "backoff_base": 1,
+    "backoff_max": 60,
+    "providers": {},
+}
+
+DEFAULT_PROVIDER_PARAMS = {
+    "rpm": None,
+    "tpm": None,
+    "burst_seconds": 10,
+    "initial_concurrency": 16,
+    "min_concurrency": 1,
+    "max_concurrency": 80,
+    "latency_target_seconds": None,
+    "decrease_factor": 0.5,
+    "decrease_cooldown_seconds": 5,
+}
+
+RATE_LIMIT_ERRORS = {"RateLimitError", "ResourceExhausted", "TooManyRequests"}
+TRANSIENT_ERRORS = {"APIConnectionError", "APITimeoutError", "InternalServerError", "ServiceUnavailable", "DeadlineExceeded"}
+
+
+def is_rate_limited(error: Exception) -> bool:
+    return getattr(error, "status_code", None) == 429 or getattr(error, "code", None) == 429 or type(error).__name__ in RATE_LIMIT_ERRORS
+
+
+def is_transient(error: Exception) -> bool:
+    status = getattr(error, "status_code", None)
+    return (isinstance(status, int) and status >= 500) or type(error).__name__ in TRANSIENT_ERRORS
+
+
+def estimate_tokens(text: str) -> int:
+    return len(str(text)) // 4 + 1
+
+
+class AdaptiveConcurrency:
+    """
+    Concurrency limit adjusted with additive increase / multiplicative decrease: every successful
+    call adds 1/limit (so about +1 per round of `limit` calls), and a rate-limited call (or one
+    slower than latency_target) multiplies the limit by decrease_factor, at most once per cooldown
+    so a single burst of 429s only halves it once.
+    """
+
+    def __init__(self, params: dict):
+        self.limit = float(params['initial_concurrency'])
+        self.minimum = params['min_concurrency']
+        self.maximum = params['max_concurrency']
+        self.latency_target = params.get('latency_target_seconds')
+        self.decrease_factor = params['decrease_factor']
+        self.cooldown = params['decrease_cooldown_seconds']
+        self.in_flight = 0
+        self.throttled = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False, latency: float = None):
+        with self._condition:
+            self.in_flight -= 1
+            slow = self.latency_target is not None and latency is not None and latency > self.latency_target
+            if throttled or slow:
+                self.throttled += throttled
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            elif latency is not None:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class ProviderBudget:
+    """
+    Shared request (RPM) and token (TPM) budgets plus adaptive concurrency for one provider.
+    """
+
+    def __init__(self, params: dict):
+        self.params = {**DEFAULT_PROVIDER_PARAMS, **(params or {})}
+        burst = self.params['burst_seconds']
+        self.requests = TokenBucket(self.params['rpm'] / 60, self.params['rpm'] / 60 * burst) if self.params['rpm'] else None
+        self.tokens = TokenBucket(self.params['tpm'] / 60, self.params['tpm'] / 60 * burst) if self.params['tpm'] else None
+        self.concurrency = AdaptiveConcurrency(self.params)
+
+    def acquire(self, tokens: int):
+        if self.requests is not None:
+            self.requests.acquire()
+        if self.tokens is not None:
+            self.tokens.acquire(min(tokens, self.tokens.capacity))
+        self.concurrency.acquire()
+
+
+class LLMGateway:
+    """
+    Process-wide entry point for every LLM provider call (OpenAI through LangChain or the raw
+    client, Vertex), so concurrent nodes share one request/token budget per provider.
+
+    Rate-limited and transient failures are retried here with exponential backoff; clients
+    should be created with their own retries disabled so that 429s are seen by the gateway.
+    """
+
+    def __init__(self, params: dict = None):
+        self.params = {**DEFAULT_PARAMS, **(params or {})}
+        self._providers = {}
+        self._lock = threading.Lock()
+
+    def budget(self, provider: str) -> ProviderBudget:
+        with self._lock:
+            if provider not in self._providers:
+                self._providers[provider] = ProviderBudget((self.params.get('providers') or {}).get(provider))
+            return self._providers[provider]
+
+    def _backoff(self, attempt: int) -> float:
+        delay = self.params['backoff_base'] * 2 ** attempt
+        return min(delay, self.params['backoff_max']) * random.uniform(0.5, 1)
+
+    def call(self, fn, provider: str = "openai", tokens: int = 0):
+        """
+        Runs fn() within the provider's budget, retrying 429s and transient errors.
+        """
+        budget = self.budget(provider)
+        attempt = 0
+        while True:
+            budget.acquire(tokens)
+            start = time.monotonic()
+            try:
+                result = fn()
+            except Exception as e:
+                throttled = is_rate_limited(e)
+                budget.concurrency.release(throttled=throttled)
+                if not (throttled or is_transient(e)) or attempt >= self.params['max_retries']:
+                    raise
+                time.sleep(self._backoff(attempt))
+                attempt += 1
+                continue
+            budget.concurrency.release(latency=time.monotonic() - start)
+            return result
+
+    def map(self, fn, items: list, provider: str = "openai", tokens: list[int] = None, return_exceptions: bool = False) -> list:
+        """
+        Calls fn(item) for every item concurrently within the provider's budget.
+
+        Returns:
+            list: results in the order of items; with return_exceptions, calls that still fail
+            after retries give their exception instead of raising
+        """
+        items = list(items)
+        if not items:
+            return []
+        tokens = tokens or [0] * len(items)
+        max_workers = min(self.budget(provider).params['max_concurrency'], len(items))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(self.call, lambda item=item: fn(item), provider, n_tokens) for item, n_tokens in zip(items, tokens)]
+            if return_exceptions:
+                return [future.exception() or future.result() for future in futures]
+            return [future.result() for future in futures]
+
+    def stats(self, provider: str) -> dict:
+        concurrency = self.budget(provider).concurrency
+        return {"concurrency_limit": round(concurrency.limit, 1), "throttled": concurrency.throttled}
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def configure(params: dict) -> LLMGateway:
+    """
+    Replaces the shared gateway with one built from params (llm_gateway_params in parameters.yml).
+    """
+    global _gateway
+    with _gateway_lock:
+        _gateway = LLMGateway(params)
+    return _gateway
+
+
+def get_gateway() -> LLMGateway:
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
@@ -0,0 +1,166 @@
+import json
+import os
+import pickle
+from functools import cache
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+from tqdm import tqdm
+
+
+def read_synonyms(synonyms_path: str) -> pd.DataFrame:
+    """
+    Reads a synonyms dump into one row per (curie, label, synonym, types).
+
+    Supported formats:
+        .jsonl / .txt: Babel synonyms files, one JSON object per line with curie,
+            preferred_name, names and types
+        .csv / .tsv: accumulated resolution history with curie and label columns and an
+            optional synonym column (defaults to the label)
+    """
+    if synonyms_path.endswith(".csv") or synonyms_path.endswith(".tsv"):
+        df = pd.read_csv(synonyms_path, sep="\t" if synonyms_path.endswith(".tsv") else ",", dtype=str)
+        if 'synonym' not in df.columns:
+            df['synonym'] = df['label']
+        if 'types' not in df.columns:
+            df['types'] = ""
+        return df[['curie', 'label', 'synonym', 'types']].dropna(subset=['curie', 'synonym'])
+
+    rows = []
+    with open(synonyms_path) as f:
+        for line in tqdm(f, desc="reading synonyms"):
+            entry = json.loads(line)
+            label = entry.get('preferred_name', "")
+            types = "|".join(item.replace("biolink:", "") for item in entry.get('types', []))
+            for synonym in dict.fromkeys([label] + entry.get('names', [])):
+                if synonym:
+                    rows.append((entry['curie'], label, synonym, types))
+    return pd.DataFrame(rows, columns=['curie', 'label', 'synonym', 'types'])
+
+
+def build_index(synonyms_path: str, index_dir: str) -> None:
+    """
+    Builds a character-trigram TF-IDF index over every synonym and stores it in index_dir as an
+    inverted index (one posting list of synonym rows per trigram) that is memory-mapped on load.
+    """
+    synonyms = read_synonyms(synonyms_path)
+    vectorizer = TfidfVectorizer(analyzer="char_wb", ngram_range=(3, 3), lowercase=True, dtype=np.float32)
+    matrix = vectorizer.fit_transform(synonyms['synonym'].astype(str)).tocsc()
+
+    os.makedirs(index_dir, exist_ok=True)
+    np.save(os.path.join(index_dir, "postings_data.npy"), matrix.data)
+    np.save(os.path.join(index_dir, "postings_rows.npy"), matrix.indices)
+    np.save(os.path.join(index_dir, "postings_indptr.npy"), matrix.indptr)
+    with open(os.path.join(index_dir, "vectorizer.pkl"), "wb") as f:
+        pickle.dump(vectorizer, f)
+    synonyms[['curie', 'label', 'types']].reset_index(drop=True).to_pickle(os.path.join(index_dir, "entries.pkl"))
+    print(f"indexed {len(synonyms)} synonyms for {synonyms['curie'].nunique()} curies in {index_dir}")
+
+
+class LocalNameIndex:
+    """
+    Offline stand-in for the Name Resolver lookup service, answering queries from an index
+    built with build_index().
+
+    Query trigrams whose posting lists are longer than max_postings (" ac", "ine", "ide" in a
+    Babel-sized dump) carry almost no weight and would dominate the cost of every query, so they
+    are skipped, as with an IDF cutoff. A query made only of such trigrams uses its
+    fallback_terms rarest ones.
+    """
+
+    def __init__(self, index_dir: str, max_postings: int = None, fallback_terms: int = 3):
+        self.max_postings = max_postings
+        self.fallback_terms = fallback_terms
+        self.data = np.load(os.path.join(index_dir, "postings_data.npy"), mmap_mode="r")
+        self.rows = np.load(os.path.join(index_dir, "postings_rows.npy"), mmap_mode="r")
+        self.indptr = np.load(os.path.join(index_dir, "postings_indptr.npy"), mmap_mode="r")
+        with open(os.path.join(index_dir, "vectorizer.pkl"), "rb") as f:
+            self.vectorizer = pickle.load(f)
+        entries = pd.read_pickle(os.path.join(index_dir, "entries.pkl"))
+        self.curies = entries['curie'].to_numpy()
+        self.labels = entries['label'].to_numpy()
+        self.types = entries['types'].fillna("")
+        self._masks = {}
+
+    def filter_mask(self, biolink_types=None, only_prefixes=None, exclude_prefixes=None):
+        """
+        Boolean mask over all index entries matching the type and prefix filters, computed once
+        per distinct filter and reused for every query. Entries without types pass the type
+        filter. None if no filter is set.
+        """
+        key = (tuple(biolink_types or ()), tuple(only_prefixes or ()), tuple(exclude_prefixes or ()))
+        if key == ((), (), ()):
+            return None
+        if key not in self._masks:
+            mask = pd.Series(True, index=self.types.index)
+            if biolink_types:
+                types = ("|" + self.types + "|")
+                typed = pd.concat([types.str.contains(f"|{item.replace('biolink:', '')}|", regex=False) for item in biolink_types], axis=1).any(axis=1)
+                # resolution history (csv/tsv) has no types; those entries are not filtered by type
+                mask &= typed | (self.types == "")
+            prefixes = pd.Series(self.curies).str.split(":").str[0]
+            if only_prefixes:
+                mask &= prefixes.isin(only_prefixes)
+            if exclude_prefixes:
+                mask &= ~prefixes.isin(exclude_prefixes)
+            self._masks[key] = mask.to_numpy()
+        return self._masks[key]
+
+    def query_terms(self, terms: np.ndarray, weights: np.ndarray) -> list[tuple]:
+        """
+        (term, weight) pairs of a query to score, without the terms over max_postings.
+        """
+        pairs = list(zip(terms, weights))
+        if not self.max_postings:
+            return pairs
+        lengths = {term: self.indptr[term + 1] - self.indptr[term] for term in terms}
+        kept = [(term, weight) for term, weight in pairs if lengths[term] <= self.max_postings]
+        return kept or sorted(pairs, key=lambda pair: lengths[pair[0]])[:self.fallback_terms]
+
+    def lookup(self, name: str, limit: int = 10, offset: int = 0, biolink_types=None, only_prefixes=None, exclude_prefixes=None) -> tuple[list[str], list[str]]:
+        """
+        Returns:
+            tuple: ranked (curies, labels), best match first, one entry per curie, restricted to
+            entries with one of biolink_types and a CURIE prefix allowed by the prefix filters
+        """
+        query = self.vectorizer.transform([name])
+        if query.nnz == 0:
+            return [], []
+        terms = self.query_terms(query.indices, query.data)
+        rows = []
+        weights = []
+        for term, weight in terms:
+            start, end = self.indptr[term], self.indptr[term + 1]
+            rows.append(self.rows[start:end])
+            weights.append(self.data[start:end] * weight)
+        candidates, inverse = np.unique(np.concatenate(rows), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weights))
+        mask = self.filter_mask(biolink_types, only_prefixes, exclude_prefixes)
+        if mask is not None:
+            keep = mask[candidates]
+            candidates, scores = candidates[keep], scores[keep]
+            if len(candidates) == 0:
+                return [], []
+
+        curies = []
+        labels = []
+        seen = set()
+        # several synonyms can share a curie, so look at more rows than we return
+        n_top = min(len(scores), (offset + limit) * 20)
+        top = np.argpartition(-scores, n_top - 1)[:n_top]
+        for position in top[np.argsort(-scores[top], kind="stable")]:
+            row = candidates[position]
+            if self.curies[row] in seen:
+                continue
+            seen.add(self.curies[row])
+            curies.append(self.curies[row])
+            labels.append(self.labels[row])
+            if len(curies) >= offset + limit:
+                break
+        return curies[offset:], labels[offset:]
+
+
+@cache
+def get_index(index_dir: str, max_postings: int = None) -> LocalNameIndex:
+    return LocalNameIndex(index_dir, max_postings)
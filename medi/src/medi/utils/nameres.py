@@ -1,9 +1,46 @@
 import pandas as pd
-from io import StringIO
-import requests
 from tqdm import tqdm
-from functools import cache
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import re
+import json
+from medi.utils import response_cache, http_client, local_nameres, journal
+
+def clean_name(name: str) -> str:
+    # need space following semicolon delimiter but eliminate double spaces
+    return re.sub('\W+',' ', name)
+
+def build_request(name: str, params: dict) -> str:
+    return (params['url']+
+            params['service']+
+            '?string='+
+            clean_name(name)+
+            '&autocomplete='+
+            str(params['autocomplete_setting']).lower()+
+            '&offset='+
+            str(params['offset'])+
+            '&limit='+
+            str(params['id_limit'])+
+            build_filters(params))
+
+def build_filters(params: dict) -> str:
+    """
+    Biolink type and CURIE prefix restrictions for the lookup query string, configured per call
+    site with biolink_types, only_prefixes and exclude_prefixes.
+    """
+    filters = ''.join('&biolink_type='+item for item in params.get('biolink_types') or [])
+    if params.get('only_prefixes'):
+        filters += '&only_prefixes='+'|'.join(params['only_prefixes'])
+    if params.get('exclude_prefixes'):
+        filters += '&exclude_prefixes='+'|'.join(params['exclude_prefixes'])
+    return filters
+
+def parse_results(results: list[dict]) -> tuple[list[str], list[str]]:
+    """
+    Turns a list of NameRes results into parallel (curies, labels) lists, or the error result if empty.
+    """
+    if not results:
+        return ["Error"], ["Error"]
+    return [item['curie'] for item in results], [item.get('label', "") for item in results]
 
 def nameres(name:str, params:dict):
     """
@@ -20,36 +57,124 @@ def nameres(name:str, params:dict):
     if not name or type(name) == float:
         print("No name provided or blank name provided")
         return ['Error'], ['Error']
-    # need space following semicolon delimiter but eliminate double spaces
-    name = re.sub('\W+',' ', name)
-    itemRequest = (params['url']+
-                   params['service']+
-                   '?string='+
-                   name+
-                   '&autocomplete='+
-                   str(params['autocomplete_setting']).lower()+
-                   '&offset='+
-                   str(params['offset'])+
-                   '&limit='+
-                   str(params['id_limit']))
-    success = False
-    failedCounts = 0
-    
-    while not success:
-        try:
-            returned = (pd.read_json(StringIO(requests.get(itemRequest, timeout=params.get('timeout')).text)))
-            resolvedName = returned.curie
-            resolvedLabel = returned.label
-            success = True
-        except:
-            failedCounts += 1
-        if failedCounts >= 3:
-            print(f"could not resolve concept {name}")
-            print(f"request: {itemRequest}")
-            return ["Error"], ["Error"]
-   
+    if params.get('backend') == 'local':
+        return nameres_local(name, params)
+    itemRequest = build_request(name, params)
+    store, settings = response_cache.cache_from_params(params)
+    if store is not None:
+        key = response_cache.make_key(itemRequest)
+        cached = store.get("nameres", key, settings['version'], settings.get('ttl_days'))
+        if cached is not None:
+            return cached['curie'], cached['label']
+
+    try:
+        response = http_client.get_client().get(itemRequest, timeout=params.get('timeout'))
+        response.raise_for_status()
+        resolvedName, resolvedLabel = parse_results(response.json())
+    except Exception:
+        resolvedName, resolvedLabel = ["Error"], ["Error"]
+    if resolvedName == ["Error"]:
+        print(f"could not resolve concept {name}")
+        print(f"request: {itemRequest}")
+        return resolvedName, resolvedLabel
+
+    if store is not None:
+        store.set("nameres", key, {'curie': resolvedName, 'label': resolvedLabel}, settings['version'])
     return resolvedName, resolvedLabel
 
+def nameres_local(name: str, params: dict):
+    """
+    Resolves a name against the offline index in params['local_index_dir'] (see local_nameres.build_index).
+    """
+    index = local_nameres.get_index(params['local_index_dir'], params.get('local_max_postings'))
+    return parse_results([
+        {'curie': curie, 'label': label}
+        for curie, label in zip(*index.lookup(
+            clean_name(name),
+            params['id_limit'],
+            params['offset'],
+            biolink_types=params.get('biolink_types'),
+            only_prefixes=params.get('only_prefixes'),
+            exclude_prefixes=params.get('exclude_prefixes'),
+        ))
+    ])
+
+def _post_bulk_chunk(names: list[str], params: dict) -> dict:
+    """
+    Sends one bulk-lookup request for a chunk of names.
+
+    Returns:
+        dict: name -> (curies, labels) for every name in the chunk, or an empty dict if the request failed.
+    """
+    cleaned = {name: clean_name(name) for name in names}
+    body = {
+        "strings": list(dict.fromkeys(cleaned.values())),
+        "autocomplete": bool(params['autocomplete_setting']),
+        "offset": params['offset'],
+        "limit": params['id_limit'],
+        "biolink_types": list(params.get('biolink_types') or []),
+        "only_prefixes": '|'.join(params.get('only_prefixes') or []),
+        "exclude_prefixes": '|'.join(params.get('exclude_prefixes') or []),
+    }
+    try:
+        response = http_client.get_client().post(params['url'] + params['bulk_service'], json=body, timeout=params.get('timeout'))
+        response.raise_for_status()
+        output = response.json()
+    except Exception as e:
+        print(f"bulk lookup failed for chunk starting with {names[0]}: {e}")
+        return {}
+    return {name: parse_results(output.get(cleaned_name)) for name, cleaned_name in cleaned.items()}
+
+def nameres_bulk(names: list[str], params: dict) -> dict:
+    """
+    Resolves many names with chunked bulk-lookup requests, several chunks at a time.
+    Names in a chunk that fails are resolved one by one with nameres().
+
+    Args:
+        names (list[str]): strings to be identified; duplicates are resolved once
+        params (dict): name resolver parameters, including bulk_service, bulk_chunk_size and bulk_concurrency
+
+    Returns:
+        dict: name -> (curies, labels)
+    """
+    if params.get('backend') == 'local':
+        return {name: nameres(name, params) for name in tqdm(dict.fromkeys(names), desc="resolving locally")}
+
+    results = {}
+    to_fetch = []
+    store, settings = response_cache.cache_from_params(params)
+    keys = {}
+    n_cached = 0
+    for name in dict.fromkeys(names):
+        if not isinstance(name, str) or not name:
+            results[name] = (["Error"], ["Error"])
+            continue
+        if store is not None:
+            keys[name] = response_cache.make_key(build_request(name, params))
+            cached = store.get("nameres", keys[name], settings['version'], settings.get('ttl_days'))
+            if cached is not None:
+                results[name] = (cached['curie'], cached['label'])
+                n_cached += 1
+                continue
+        to_fetch.append(name)
+    print(f"{n_cached} names answered from cache, {len(to_fetch)} to resolve")
+
+    chunk_size = params.get('bulk_chunk_size', 100)
+    chunks = [to_fetch[start:start + chunk_size] for start in range(0, len(to_fetch), chunk_size)]
+    with ThreadPoolExecutor(max_workers=params.get('bulk_concurrency', 4)) as executor:
+        futures = {executor.submit(_post_bulk_chunk, chunk, params): chunk for chunk in chunks}
+        for future in tqdm(as_completed(futures), total=len(futures), desc="bulk resolving"):
+            chunk = futures[future]
+            resolved = future.result()
+            for name in chunk:
+                if name not in resolved:
+                    resolved[name] = nameres(name, params)
+                elif store is not None and resolved[name][0] != ["Error"]:
+                    curies, labels = resolved[name]
+                    store.set("nameres", keys[name], {'curie': curies, 'label': labels}, settings['version'])
+            results.update(resolved)
+    return results
+
 def identify(name: str, params: dict):
     """
     Args:
@@ -65,21 +190,33 @@ def identify(name: str, params: dict):
     return id[0], label[0]
 
 def nameres_column (df: pd.DataFrame, colname: str, params: dict) -> pd.DataFrame:
-    out_curie = []
-    out_label = []
-    cache = {}
-    for idx, row in tqdm(df.iterrows(), total=len(df), desc="resolving column..."):
-        if row[colname] in cache:
-            curie, label = cache[row[colname]]
-        else:
-            curie, label = identify(row[colname], params)
-            cache[row[colname]]=curie,label
-        out_curie.append(curie)
-        out_label.append(label)
-    
-    df[f"{colname}_curie"]=out_curie
-    df[f"{colname}_curie_label"]=out_label
+    """
+    Resolves every distinct string in a column and adds the top hit as {colname}_curie and
+    {colname}_curie_label. With params['store_candidates'], the full ranked candidate lists are
+    also kept as JSON arrays in {colname}_candidate_curies / {colname}_candidate_labels so later
+    steps (improve_ids) can reuse them without querying again.
+    """
+    names = list(dict.fromkeys(df[colname]))
+    checkpoint = journal.open_journal("nameres_column", [str(name) for name in names], params)
+    results = {name: tuple(checkpoint[str(name)]) for name in names if str(name) in checkpoint}
+    missing = [name for name in names if name not in results]
+    if params.get('bulk'):
+        resolved = nameres_bulk(missing, params)
+        for name, result in resolved.items():
+            if result[0] != ["Error"]:
+                checkpoint.record(str(name), list(result))
+        results.update(resolved)
+    else:
+        for name in tqdm(missing, desc="resolving column..."):
+            results[name] = nameres(name, params)
+            if results[name][0] != ["Error"]:
+                checkpoint.record(str(name), list(results[name]))
 
+    df[f"{colname}_curie"] = df[colname].map({name: curies[0] for name, (curies, _) in results.items()}).fillna("Error")
+    df[f"{colname}_curie_label"] = df[colname].map({name: labels[0] for name, (_, labels) in results.items()}).fillna("Error")
+    if params.get('store_candidates'):
+        df[f"{colname}_candidate_curies"] = df[colname].map({name: json.dumps(curies) for name, (curies, _) in results.items()})
+        df[f"{colname}_candidate_labels"] = df[colname].map({name: json.dumps(labels) for name, (_, labels) in results.items()})
     return df
 
 def nameres_multiple_columns(df: pd.DataFrame, colnames: list[str], params:dict) -> pd.DataFrame:
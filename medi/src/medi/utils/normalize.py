@@ -1,71 +1,160 @@
-from tqdm import tqdm 
+from tqdm import tqdm
 import pandas as pd
-import requests
 import json
-from functools import cache
+from medi.utils import response_cache, clique_cache, http_client, journal
 
+ERROR_RESULT = (["Error"], ["Error"], ["Error"])
 
-def normalize_multiple_columns(df:pd.DataFrame, column_names:list[str]) -> pd.DataFrame:
+
+def normalize_multiple_columns(df:pd.DataFrame, column_names:list[str], params: dict) -> pd.DataFrame:
+    """
+    Normalizes several columns, sending the unique CURIEs of all of them to NodeNorm in one batched pass.
+    """
+    curies = pd.concat([df[item].dropna().astype(str) for item in column_names]).unique()
+    results = normalize_curies(list(curies), params)
     for item in column_names:
-        df = normalize_column(df, item)
+        df = _join_results(df, item, results)
     return df
 
-def normalize_column(df:pd.DataFrame, column_name:str) -> pd.DataFrame:
+def normalize_column(df:pd.DataFrame, column_name:str, params: dict) -> pd.DataFrame:
     '''
     Args:
         df: dataframe with column of properly-formatted IDs (ONTOLOGY:ID_NO)
         column_name: name of column to be normalized
-    
+        params: nodenorm parameters (base_url, query, chunk_size, flags)
+
     Returns:
         pd.DataFrame: dataframe with new columns column_name_norm and column_name_norm_label
 
     '''
-    cache = {}
-    norm_id = []
-    norm_label = []
-    alt_ids_col = []
-    id = ""
-    label = ""
-    for _, row in tqdm(df.iterrows(), total=len(df), desc="normalizing"):
-        name = row[column_name]
-        if name in cache:
-            id, label, alt_ids = cache[name]
-            norm_id.append(id)
-            norm_label.append(label)
-            alt_ids_col.append(alt_ids)
-        else:  
-            id, label, alt_ids = normalize(name)
-            cache[name]=id, label, alt_ids
-            norm_id.append(id)
-            norm_label.append(label)
-            alt_ids_col.append(alt_ids)
-    
-    df[f"{column_name}_norm"]=norm_id
-    df[f"{column_name}_norm_label"]=norm_label
-    df["alternate_ids"]=alt_ids_col
+    results = normalize_curies(list(df[column_name].dropna().astype(str).unique()), params)
+    return _join_results(df, column_name, results)
+
+
+def _join_results(df: pd.DataFrame, column_name: str, results: dict) -> pd.DataFrame:
+    """
+    Maps normalization results back onto the dataframe with a single reindex on column_name.
+    Blank cells get the error result.
+    """
+    lookup = pd.DataFrame.from_dict(
+        results,
+        orient="index",
+        columns=[f"{column_name}_norm", f"{column_name}_norm_label", "alternate_ids"],
+    )
+    joined = lookup.reindex(df[column_name].astype(str)).set_axis(df.index)
+    missing = joined[f"{column_name}_norm"].isna()
+    for col in lookup.columns:
+        df[col] = [ERROR_RESULT[0] if blank else value for value, blank in zip(joined[col], missing)]
     return df
 
 
-@cache
-def normalize(item: str):
-    item_request = f"https://nodenormalization-sri.renci.org/1.5/get_normalized_nodes?curie={item}&conflate=true&drug_chemical_conflate=true&description=false&individual_types=false"    
-    success = False
-    failedCounts = 0
-    while not success:
-        try:
-            response = requests.get(item_request)
-            output = json.loads(response.text)
-            primary_key = list(output.keys())[0]
-            label = output[primary_key]['id']['label']
-            id = output[primary_key]['id']['identifier']
-            alternate_ids = output[item]['equivalent_identifiers']
-            alt_ids_list = list(item['identifier'] for item in alternate_ids)
-            success = True
-        except Exception as e:
-            print(f"exception on {item}")
-            print(e) 
-            #print('name resolver error')
-            failedCounts += 1
-        if failedCounts >= 5:
-            return ["Error"], ["Error"], ['Error']
-    return id, label, alt_ids_list
\ No newline at end of file
+def build_request_body(curies: list[str], params: dict) -> dict:
+    body = {"curies": list(curies)}
+    body.update({key: bool(value) for key, value in params['params'].items()})
+    return body
+
+
+def parse_result(result) -> tuple:
+    """
+    Args:
+        result: a single value from the get_normalized_nodes response (None if the curie is unknown)
+
+    Returns:
+        tuple: (id, label, alternate ids) or the error result
+    """
+    try:
+        alt_ids_list = list(item['identifier'] for item in result['equivalent_identifiers'])
+        return result['id']['identifier'], result['id'].get('label', ""), alt_ids_list
+    except (TypeError, KeyError):
+        return ERROR_RESULT
+
+
+def post_chunk(curies: list[str], params: dict) -> dict:
+    """
+    Sends one POST to get_normalized_nodes through the shared HTTP client, which handles
+    retries, backoff and rate limiting.
+
+    Returns:
+        dict: curie -> (id, label, alternate ids). Empty if the request failed.
+    """
+    url = params['base_url'] + params['query']
+    try:
+        response = http_client.get_client().post(url, json=build_request_body(curies, params), timeout=params.get('timeout'))
+        response.raise_for_status()
+        output = json.loads(response.text)
+        return {curie: parse_result(output.get(curie)) for curie in curies}
+    except Exception as e:
+        print(f"exception normalizing chunk starting with {curies[0]}")
+        print(e)
+        return {}
+
+
+def normalize_curies(curies: list[str], params: dict) -> dict:
+    """
+    Normalizes a list of curies in chunked POST requests. Each chunk is first looked up in
+    the clique cache (so members of cliques returned by earlier chunks are not re-sent) and
+    in the persistent response cache.
+
+    Args:
+        curies (list[str]): curies to normalize; duplicates are sent once
+        params (dict): nodenorm parameters, see nodenorm_params in parameters.yml
+
+    Returns:
+        dict: curie -> (id, label, alternate ids); failed curies map to the error result
+    """
+    unique = list(dict.fromkeys(str(curie) for curie in curies))
+    flags = tuple(sorted(params['params'].items()))
+    cliques = None
+    if params.get('clique_cache'):
+        cliques = clique_cache.get_clique_cache(params['clique_cache']['max_mb'])
+    store, settings = response_cache.cache_from_params(params)
+    url = params['base_url'] + params['query']
+    chunk_size = params.get('chunk_size', 1000)
+
+    checkpoint = journal.open_journal("normalize_curies", unique, params['params'])
+    results = {curie: tuple(checkpoint[curie]) for curie in unique if curie in checkpoint}
+    n_cached = 0
+    for start in tqdm(range(0, len(unique), chunk_size), desc="normalizing"):
+        to_fetch = {}
+        for curie in unique[start:start + chunk_size]:
+            if curie in results:
+                continue
+            cached = cliques.get(curie, flags) if cliques is not None else None
+            if cached is None and store is not None:
+                key = response_cache.make_key(url, {"curie": curie, **params['params']})
+                cached = store.get("nodenorm", key, settings['version'], settings.get('ttl_days'))
+                if cached is None:
+                    to_fetch[curie] = key
+                else:
+                    cached = tuple(cached)
+                    if cliques is not None:
+                        cliques.put(curie, cached, flags)
+            elif cached is None:
+                to_fetch[curie] = None
+            if cached is not None:
+                results[curie] = cached
+                n_cached += 1
+        if not to_fetch:
+            continue
+        fetched = post_chunk(list(to_fetch), params)
+        results.update(fetched)
+        for curie, result in fetched.items():
+            if result == ERROR_RESULT:
+                continue
+            checkpoint.record(curie, list(result))
+            if store is not None:
+                store.set("nodenorm", to_fetch[curie], result, settings['version'])
+            if cliques is not None:
+                cliques.put(curie, result, flags)
+
+    for curie in unique:
+        if curie not in results:
+            results[curie] = ERROR_RESULT
+    print(f"{n_cached} of {len(unique)} curies answered from cache")
+    if cliques is not None:
+        print(f"clique cache: {cliques.stats()}")
+    return results
+
+
+def normalize(item: str, params: dict):
+    return normalize_curies([item], params)[str(item)]
@@ -1,11 +1,15 @@
 import pandas as pd
 from openai import OpenAI
 import os
+import re
+import math
 import json
+from functools import cache
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 from tqdm import tqdm 
+from medi.utils import llm_cache, llm_batch, llm_gateway, journal
 
 
 def extract_outputs_and_prompts(data_dict):
@@ -22,16 +26,41 @@ def extract_outputs_and_prompts(data_dict):
         temp.append(tag_info['model_params']['temperature'])
     return output_cols, prompts, model, temp
 
-def add_tags(in_df: pd.DataFrame, tags: dict, labels_col: str) -> pd.DataFrame: 
+def add_tags(in_df: pd.DataFrame, tags: dict, labels_col: str, tagging_params: dict = None) -> pd.DataFrame: 
+    """
+    Adds one column per tag. By default each tag is a separate request per drug; with
+    tagging_params mode "combined" (see llm_tagging_params) every drug gets a single request
+    covering all tags that share a model and temperature, and with mode "packed" (see
+    llm_packed_tagging_params) each request covers one tag for many drugs. In any mode, a
+    'batch' block with enabled true (see llm_batch_params) sends the requests as offline batch jobs,
+    and a 'cascade' block with enabled true (see llm_cascade_params) answers with a cheap model
+    first and only escalates uncertain answers to the tag's model. Tags are TRUE/FALSE questions
+    unless tagging_params sets another answer_type, so every mode returns Python bools, with None
+    for answers that are not valid.
+    """
+    if tagging_params and tagging_params.get('mode') == "combined":
+        return generate_combined_features(in_df, tags, labels_col, tagging_params)
+    packing_params = tagging_params if tagging_params and tagging_params.get('mode') == "packed" else None
+    batch_params = tagging_params.get('batch') if tagging_params else None
+    cascade_params = tagging_params.get('cascade') if tagging_params else None
+    answer_type = tagging_params.get('answer_type', "boolean") if tagging_params else "boolean"
     df = in_df.copy()
     feature_names, feature_descriptions, model, temp= extract_outputs_and_prompts(tags)
     for feature_name, feature_description, model, temp in tqdm(zip(feature_names, feature_descriptions, model, temp)):
-        df = generate_features(input_df=df, new_feature_name=feature_name, feature_description=feature_description, label_colname=labels_col, model_name=model, temp=temp)
+        df = generate_features(input_df=df, new_feature_name=feature_name, feature_description=feature_description, label_colname=labels_col, model_name=model, temp=temp, packing_params=packing_params, batch_params=batch_params, cascade_params=cascade_params, answer_type=answer_type)
     print(feature_names)
     print(feature_descriptions)
     return df
 
 
+@cache
+def openai_client() -> OpenAI:
+    """
+    One OpenAI client per process, so per-row prompts reuse its connection pool.
+    """
+    return OpenAI(max_retries=0)
+
+
 def single_openai_prompt(prompt, model="gpt-4o", temperature=0.1):
     """
     Run a single prompt using OpenAI with LangChain
@@ -45,28 +74,26 @@ def single_openai_prompt(prompt, model="gpt-4o", temperature=0.1):
     Returns:
         str: The model's response
     """
-    client = OpenAI()
-    # Initialize the ChatOpenAI model
-    llm = ChatOpenAI(
-        model=model,
-        temperature=temperature
-    )
+    client = openai_client()
     #print(prompt)
     # Create a message and invoke the model
     try:
-        response = client.responses.create(
-            model=model,
-            input=prompt
+        output_text = llm_cache.cached_completion(
+            lambda: llm_gateway.get_gateway().call(
+                lambda: client.responses.create(model=model, input=prompt).output_text,
+                "openai", llm_gateway.estimate_tokens(prompt),
+            ),
+            "openai", model, None, [("user", prompt)],
         )
     except Exception as e:
         print(e)
         return ['Error']
     
-    print(f"response:{response.output_text}")
-    return response.output_text
+    print(f"response:{output_text}")
+    return output_text
 
 
-def generate_features(input_df: pd.DataFrame, new_feature_name: str, feature_description: str, label_colname: str, model_name: str, temp: float):
+def generate_features(input_df: pd.DataFrame, new_feature_name: str, feature_description: str, label_colname: str, model_name: str, temp: float, packing_params: dict = None, batch_params: dict = None, cascade_params: dict = None, answer_type: str = None):
     """
     Generate new features for a pandas DataFrame using specified model
     
@@ -80,6 +107,14 @@ def generate_features(input_df: pd.DataFrame, new_feature_name: str, feature_des
         List of names for the new feature columns to be created
     feature_descriptions : list
         List of descriptions for what each feature should represent
+    packing_params : dict, optional
+        If given, pack many drugs into each request (see generate_packed_features)
+    batch_params : dict, optional
+        If enabled, send the requests as offline batch jobs (see llm_batch.run_chat_batch)
+    cascade_params : dict, optional
+        If enabled, answer with the cheap model first and escalate uncertain answers to model_name
+    answer_type : str, optional
+        If "boolean", TRUE/FALSE answers become Python bools and any other answer None
     
     Returns:
     --------
@@ -90,7 +125,9 @@ def generate_features(input_df: pd.DataFrame, new_feature_name: str, feature_des
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY environment variable not set")
-    model = ChatOpenAI(model=model_name, temperature=temp, max_retries=3, model_kwargs={"response_format": {"type": "json_object"}})
+    model = ChatOpenAI(model=model_name, temperature=temp, max_retries=0, model_kwargs={"response_format": {"type": "json_object"}})
+    if packing_params:
+        return generate_packed_features(df, model, new_feature_name, feature_description, label_colname, model_name, temp, {'answer_type': answer_type, **packing_params})
     df[new_feature_name] = None 
     prompt = ChatPromptTemplate.from_messages([
         (
@@ -106,11 +143,397 @@ def generate_features(input_df: pd.DataFrame, new_feature_name: str, feature_des
             "drug to analyze: {drug_name}"
         )
     ])
-    chain = prompt | model
-    response = chain.batch(list(df[label_colname]), config={"max_concurrency": 80})
+    if cascade_enabled(cascade_params):
+        contents = cascade_json_prompts(prompt, model, list(df[label_colname]), model_name, temp, new_feature_name, cascade_params, batch_params)
+    else:
+        contents = batch_json_prompts(prompt, model, list(df[label_colname]), model_name, temp, new_feature_name, batch_params)
     # for i, r in enumerate(response):
     #     if not r:
     #         response[i] = False
-    feature_df = pd.DataFrame([json.loads(r.content) for r in response])
-    df.update(feature_df)
-    return df
\ No newline at end of file
+    parsed = [json.loads(content) if _is_json(content) else None for content in contents]
+    n_malformed = sum(not isinstance(item, dict) for item in parsed)
+    parsed = [item if isinstance(item, dict) else {} for item in parsed]
+    if n_malformed:
+        print(f"{new_feature_name}: {n_malformed} malformed responses left empty")
+    values = [item.get(new_feature_name) for item in parsed]
+    if answer_type == "boolean":
+        values = [parse_boolean(value) for value in values]
+    df[new_feature_name] = values
+    return df
+
+
+def batch_json_prompts(prompt: ChatPromptTemplate, model: ChatOpenAI, drug_names: list, model_name: str, temp: float, description: str, batch_params: dict = None) -> list[str]:
+    """
+    Sends one JSON-mode request per drug name, answering from the LLM cache where possible.
+    With batch_params enabled the requests go out as offline batch jobs first, and only the
+    ones the batch did not answer are sent interactively.
+
+    Returns:
+        list[str]: raw response contents, in the order of drug_names
+    """
+    chain = prompt | model
+    cache = llm_cache.get_cache()
+    messages = [[(message.type, message.content) for message in prompt.format_messages(drug_name=drug_name)] for drug_name in drug_names]
+    keys = [llm_cache.make_key("openai", model_name, temp, item, {"type": "json_object"}) for item in messages]
+    checkpoint = journal.open_journal("generate_features", keys)
+    contents = [checkpoint[key] if key in checkpoint else None for key in keys]
+
+    pending = [i for i, content in enumerate(contents) if content is None]
+    if pending and llm_batch.batch_enabled(batch_params):
+        requests = [(messages[i], model_name, temp, {"type": "json_object"}) for i in pending]
+        for i, content in zip(pending, llm_batch.run_chat_batch(requests, batch_params, description, validate=_is_json)):
+            contents[i] = content
+    if cache is not None:
+        for i in pending:
+            if contents[i] is None:
+                contents[i] = cache.get(keys[i])
+    for i in pending:
+        if contents[i] is not None and _is_json(contents[i]):
+            checkpoint.record(keys[i], contents[i])
+    missing = [i for i, content in enumerate(contents) if content is None]
+    print(f"{description}: {len(drug_names) - len(missing)} of {len(drug_names)} responses answered from journal, cache or batch")
+
+    def request(i):
+        content = chain.invoke(drug_names[i]).content
+        # checkpoint every response as it arrives so a crash later in the batch loses nothing
+        if _is_json(content):
+            checkpoint.record(keys[i], content)
+            if cache is not None:
+                cache.set(keys[i], content, "openai", model_name)
+        return content
+
+    if missing:
+        tokens = [llm_gateway.estimate_tokens(" ".join(content for _, content in messages[i])) for i in missing]
+        for i, content in zip(missing, llm_gateway.get_gateway().map(request, missing, "openai", tokens)):
+            contents[i] = content
+    return contents
+
+
+def cascade_enabled(params: dict) -> bool:
+    return bool(params) and bool(params.get('enabled'))
+
+
+def logprob_prompts(messages: list[list[tuple]], model_name: str, temp: float, description: str, response_format: dict = None) -> list[tuple]:
+    """
+    Sends each message list to model_name with log-probabilities enabled, answering from the LLM
+    cache where possible (the cached value keeps the token log-probabilities too).
+
+    This is the cascade's cheap pass and it is always sent interactively, also when batch mode is
+    enabled: its answers decide which items escalate, so batching it would put a second batch
+    window in front of the escalated requests. Only the escalations go through llm_batch.
+
+    Returns:
+        list: (content, [(token, logprob), ...]) per request; (None, []) for requests that failed
+    """
+    client = openai_client()
+    cache = llm_cache.get_cache()
+    keys = [llm_cache.make_key("openai", model_name, temp, item, response_format, logprobs=True) for item in messages]
+    results = [None] * len(messages)
+    if cache is not None:
+        for i, key in enumerate(keys):
+            cached = cache.get(key)
+            if cached is not None:
+                cached = json.loads(cached)
+                results[i] = (cached['content'], [tuple(token) for token in cached['logprobs']])
+    missing = [i for i, result in enumerate(results) if result is None]
+    print(f"{description}: {len(messages) - len(missing)} of {len(messages)} {model_name} responses answered from cache")
+
+    def request(i):
+        response = client.chat.completions.create(**llm_batch.chat_body(messages[i], model_name, temp, response_format), logprobs=True)
+        choice = response.choices[0]
+        tokens = [(token.token, token.logprob) for token in (choice.logprobs.content or [])] if choice.logprobs else []
+        if cache is not None and choice.message.content is not None:
+            cache.set(keys[i], json.dumps({"content": choice.message.content, "logprobs": tokens}), "openai", model_name)
+        return choice.message.content, tokens
+
+    tokens = [llm_gateway.estimate_tokens(" ".join(content for _, content in messages[i])) for i in missing]
+    for i, result in zip(missing, llm_gateway.get_gateway().map(request, missing, "openai", tokens, return_exceptions=True)):
+        results[i] = (None, []) if isinstance(result, Exception) else result
+    return results
+
+
+def span_confidence(tokens: list[tuple], start: int, end: int) -> float:
+    """
+    Returns:
+        float: probability of the least likely token overlapping content[start:end], 0.0 if none do
+    """
+    position = 0
+    logprobs = []
+    for token, logprob in tokens:
+        if position + len(token) > start and position < end:
+            logprobs.append(logprob)
+        position += len(token)
+    return math.exp(min(logprobs)) if logprobs else 0.0
+
+
+def field_confidence(content: str, tokens: list[tuple], field: str, start: int = 0, end: int = None) -> float:
+    """
+    Confidence in the value of one JSON field, from the tokens of the value only (the key and
+    JSON syntax are near-certain and would say nothing about the answer).
+    """
+    if content is None:
+        return 0.0
+    pattern = re.compile(rf'"{re.escape(field)}"\s*:\s*("[^"]*"|[^\s,}}\]]+)')
+    match = pattern.search(content, start, len(content) if end is None else end)
+    if match is None:
+        return 0.0
+    return span_confidence(tokens, *match.span(1))
+
+
+def packed_confidence(content: str, tokens: list[tuple], item_id: str, feature_name: str) -> float:
+    """
+    Confidence in one item's value in a packed response, looked up within the item's own object.
+    """
+    match = re.search(rf'"id"\s*:\s*"?{re.escape(item_id)}"?\s*[,}}]', content or "")
+    if match is None:
+        return 0.0
+    start = content.rfind("{", 0, match.start())
+    end = content.find("}", match.start())
+    return field_confidence(content, tokens, feature_name, max(start, 0), len(content) if end == -1 else end + 1)
+
+
+def feature_confidence(content: str, tokens: list[tuple], feature_name: str, answer_type: str = None) -> float:
+    """
+    Returns:
+        float: confidence in a single-feature response, 0.0 if it is not valid
+    """
+    try:
+        output = json.loads(content)
+    except (TypeError, ValueError):
+        return 0.0
+    value = output.get(feature_name) if isinstance(output, dict) else None
+    if answer_type == "boolean":
+        value = parse_boolean(value)
+    if value is None or isinstance(value, (dict, list)):
+        return 0.0
+    return field_confidence(content, tokens, feature_name)
+
+
+def report_escalation(name: str, n_escalated: int, n_total: int, params: dict, model_name: str):
+    rate = n_escalated / n_total if n_total else 0.0
+    print(f"{name}: escalated {n_escalated} of {n_total} ({rate:.1%}) from {params['cheap_model']} to {model_name} at threshold {params['threshold']}")
+
+
+def cascade_json_prompts(prompt: ChatPromptTemplate, model: ChatOpenAI, drug_names: list, model_name: str, temp: float, feature_name: str, cascade_params: dict, batch_params: dict = None) -> list[str]:
+    """
+    Answers every drug with cascade_params['cheap_model'] first, keeping answers that are valid
+    and at least cascade_params['threshold'] confident; the rest are sent to model_name through
+    batch_json_prompts, so with batch_params enabled only the escalations are batched.
+    """
+    messages = [[(message.type, message.content) for message in prompt.format_messages(drug_name=drug_name)] for drug_name in drug_names]
+    cheap = logprob_prompts(messages, cascade_params['cheap_model'], cascade_params.get('temperature', temp), feature_name, {"type": "json_object"})
+    contents = [
+        content if feature_confidence(content, tokens, feature_name, cascade_params.get('answer_type')) >= cascade_params['threshold'] else None
+        for content, tokens in cheap
+    ]
+    escalate = [i for i, content in enumerate(contents) if content is None]
+    report_escalation(feature_name, len(escalate), len(drug_names), cascade_params, model_name)
+    if escalate:
+        escalated = batch_json_prompts(prompt, model, [drug_names[i] for i in escalate], model_name, temp, f"{feature_name} (escalated)", batch_params)
+        for i, content in zip(escalate, escalated):
+            contents[i] = content
+    return contents
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4) -> int:
+    return int(len(str(text)) / chars_per_token) + 1
+
+
+def pack_items(drug_names: list, params: dict) -> list[list[int]]:
+    """
+    Groups drug positions into packs, filling each pack toward params['token_budget'] estimated
+    input tokens (and at most params['max_items'] drugs).
+    """
+    packs = []
+    current = []
+    used = 0
+    for i, drug_name in enumerate(drug_names):
+        # the id, separator and newline cost a few tokens per item on top of the name
+        cost = estimate_tokens(drug_name, params['chars_per_token']) + params['tokens_per_item']
+        if current and (used + cost > params['token_budget'] or len(current) >= params['max_items']):
+            packs.append(current)
+            current = []
+            used = 0
+        current.append(i)
+        used += cost
+    if current:
+        packs.append(current)
+    return packs
+
+
+def parse_packed_response(content: str, ids: list[str], feature_name: str, answer_type: str = None) -> dict:
+    """
+    Returns:
+        dict: item id -> value for every requested id that came back with a valid value
+        (a TRUE/FALSE answer parsed to bool if answer_type is "boolean")
+    """
+    try:
+        output = json.loads(content)
+    except (TypeError, ValueError):
+        return {}
+    results = output.get('results') if isinstance(output, dict) else None
+    if not isinstance(results, list):
+        return {}
+    values = {}
+    for item in results:
+        if not isinstance(item, dict) or str(item.get('id')) not in ids:
+            continue
+        value = item.get(feature_name)
+        if answer_type == "boolean":
+            value = parse_boolean(value)
+        if value is not None and not isinstance(value, (dict, list)):
+            values[str(item['id'])] = value
+    return values
+
+
+def generate_packed_features(df: pd.DataFrame, model: ChatOpenAI, new_feature_name: str, feature_description: str, label_colname: str, model_name: str, temp: float, params: dict) -> pd.DataFrame:
+    """
+    Generates a short-answer feature for many drugs per request. The model must return a JSON
+    array keyed by item id; drugs that are missing from the response or come back malformed are
+    re-requested individually. With an enabled params['cascade'], the packs are answered by the
+    cheap model first and only the uncertain drugs are packed again for model_name.
+    """
+    escaped_description = feature_description.replace("{", "{{").replace("}", "}}")
+    prompt = ChatPromptTemplate.from_messages([
+        (
+            "system",
+            f"""You are a medical doctor trying to categorize a list of drugs.
+            For each drug, extract the following feature:
+            "{new_feature_name}: {escaped_description}".
+            Return ONLY a JSON object of the form {{{{"results": [{{{{"id": "<drug id>", "{new_feature_name}": <value>}}}}, ...]}}}}
+            with exactly one entry per drug id. No explanations or other text."""
+        ),
+        (
+            "user",
+            "drugs to analyze:\n{drug_name}"
+        )
+    ])
+    drug_names = list(df[label_colname])
+    packs = pack_items(drug_names, params)
+    packed_inputs = ["\n".join(f"{i}: {drug_names[i]}" for i in pack) for pack in packs]
+    cascade = params.get('cascade')
+    if cascade_enabled(cascade):
+        messages = [[(message.type, message.content) for message in prompt.format_messages(drug_name=item)] for item in packed_inputs]
+        cheap = logprob_prompts(messages, cascade['cheap_model'], cascade.get('temperature', temp), f"{new_feature_name} ({len(drug_names)} drugs in {len(packs)} packs)", {"type": "json_object"})
+        values = [None] * len(drug_names)
+        for pack, (content, tokens) in zip(packs, cheap):
+            parsed = parse_packed_response(content, [str(i) for i in pack], new_feature_name, params.get('answer_type'))
+            for i in pack:
+                if str(i) in parsed and packed_confidence(content, tokens, str(i), new_feature_name) >= cascade['threshold']:
+                    values[i] = parsed[str(i)]
+        escalate = [i for i, value in enumerate(values) if value is None]
+        report_escalation(new_feature_name, len(escalate), len(drug_names), cascade, model_name)
+        if escalate:
+            escalated = df.iloc[escalate][[label_colname]].reset_index(drop=True)
+            escalated = generate_packed_features(escalated, model, new_feature_name, feature_description, label_colname, model_name, temp, {**params, 'cascade': None})
+            for i, value in zip(escalate, escalated[new_feature_name]):
+                values[i] = value
+        df[new_feature_name] = values
+        return df
+    contents = batch_json_prompts(prompt, model, packed_inputs, model_name, temp, f"{new_feature_name} ({len(drug_names)} drugs in {len(packs)} packs)", params.get('batch'))
+
+    values = [None] * len(drug_names)
+    for pack, content in zip(packs, contents):
+        parsed = parse_packed_response(content, [str(i) for i in pack], new_feature_name, params.get('answer_type'))
+        for i in pack:
+            values[i] = parsed.get(str(i))
+    missing = [i for i, value in enumerate(values) if value is None]
+    print(f"{new_feature_name}: re-requesting {len(missing)} of {len(drug_names)} drugs individually")
+    if missing:
+        retry = df.iloc[missing][[label_colname]].reset_index(drop=True)
+        retry = generate_features(input_df=retry, new_feature_name=new_feature_name, feature_description=feature_description, label_colname=label_colname, model_name=model_name, temp=temp, answer_type=params.get('answer_type'))
+        for i, value in zip(missing, retry[new_feature_name]):
+            values[i] = value
+    df[new_feature_name] = values
+    return df
+
+
+def parse_boolean(value):
+    """
+    Returns:
+        bool: the value as a boolean, or None if it is not a TRUE/FALSE answer
+    """
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().upper() in ("TRUE", "FALSE"):
+        return value.strip().upper() == "TRUE"
+    return None
+
+
+def parse_combined_response(content: str, feature_names: list[str]) -> dict:
+    """
+    Validates a combined response feature by feature.
+
+    Returns:
+        dict: feature name -> boolean, or None for features that are missing or invalid
+    """
+    try:
+        output = json.loads(content)
+    except (TypeError, ValueError):
+        output = None
+    if not isinstance(output, dict):
+        return {feature_name: None for feature_name in feature_names}
+    return {feature_name: parse_boolean(output.get(feature_name)) for feature_name in feature_names}
+
+
+def generate_combined_features(input_df: pd.DataFrame, tags: dict, label_colname: str, params: dict) -> pd.DataFrame:
+    """
+    Tags every drug with all features in one JSON-mode request per drug (one per model and
+    temperature if the tags use several), using a schema built from the tag dict.
+
+    Each feature of each response is validated on its own; features that come back missing or
+    invalid are re-requested with the single-feature prompt for just the affected drugs. With an
+    enabled params['cascade'], the combined requests go to the cheap model and features answered
+    below the confidence threshold are re-requested the same way, from the tag's own model.
+    """
+    df = input_df.copy()
+    feature_names, feature_descriptions, models, temps = extract_outputs_and_prompts(tags)
+    groups = {}
+    for feature_name, feature_description, model_name, temp in zip(feature_names, feature_descriptions, models, temps):
+        groups.setdefault((model_name, temp), []).append((feature_name, feature_description))
+
+    drug_names = list(df[label_colname])
+    cascade = params.get('cascade')
+    for (model_name, temp), features in groups.items():
+        schema = "\n".join(f'"{name}": {description}' for name, description in features)
+        schema = schema.replace("{", "{{").replace("}", "}}")
+        model = ChatOpenAI(model=model_name, temperature=temp, max_retries=0, model_kwargs={"response_format": {"type": "json_object"}})
+        prompt = ChatPromptTemplate.from_messages([
+            ("system", params['system_prompt'] + "\n" + schema),
+            ("user", "drug to analyze: {drug_name}"),
+        ])
+        names = [name for name, _ in features]
+        if cascade_enabled(cascade):
+            messages = [[(message.type, message.content) for message in prompt.format_messages(drug_name=drug_name)] for drug_name in drug_names]
+            cheap = logprob_prompts(messages, cascade['cheap_model'], cascade.get('temperature', temp), f"{len(features)} combined features", {"type": "json_object"})
+            parsed = [parse_combined_response(content, names) for content, _ in cheap]
+            for row, (content, tokens) in zip(parsed, cheap):
+                for name in names:
+                    if row[name] is not None and field_confidence(content, tokens, name) < cascade['threshold']:
+                        row[name] = None
+        else:
+            contents = batch_json_prompts(prompt, model, drug_names, model_name, temp, f"{len(features)} combined features", params.get('batch'))
+            parsed = [parse_combined_response(content, names) for content in contents]
+
+        for name, description in features:
+            values = [row[name] for row in parsed]
+            invalid = [i for i, value in enumerate(values) if value is None]
+            if cascade_enabled(cascade):
+                report_escalation(name, len(invalid), len(values), cascade, model_name)
+            else:
+                print(f"{name}: {len(invalid)} of {len(values)} invalid in combined responses")
+            if invalid and (params.get('fallback_to_single', True) or cascade_enabled(cascade)):
+                retry = df.iloc[invalid][[label_colname]].reset_index(drop=True)
+                retry = generate_features(input_df=retry, new_feature_name=name, feature_description=description, label_colname=label_colname, model_name=model_name, temp=temp, answer_type="boolean")
+                for i, value in zip(invalid, retry[name]):
+                    values[i] = value
+            df[name] = values
+    return df
+
+
+def _is_json(content: str) -> bool:
+    try:
+        json.loads(content)
+        return True
+    except (TypeError, ValueError):
+        return False
@@ -4,6 +4,7 @@ import aiohttp
 from tqdm import tqdm 
 from datetime import datetime
 import re 
+from medi.utils import dates
 
 def preprocess_ema(df: pd.DataFrame) -> pd.DataFrame:
     """
@@ -68,6 +69,7 @@ def preprocess_pmda(rawdata:pd.DataFrame) -> pd.DataFrame:
 
 
 def reformat_dates_ema(df: pd.DataFrame) -> pd.DataFrame:
-    df['approval_date'] = pd.to_datetime(df['approval_date'], format='%d/%m/%Y').dt.strftime('%Y%m%d')
+    parsed = dates.parse_dates(df['approval_date'], {'formats': ['%d/%m/%Y']})
+    df['approval_date'] = parsed.fillna(df['approval_date'])
     return df
 
@@ -0,0 +1,104 @@
+import pandas as pd
+
+from medi.utils import canonicalize, lexical_similarity
+
+
+def raw_form(names: pd.Series) -> pd.Series:
+    """
+    Lower case, punctuation and repeated spaces removed, but nothing else: unlike the canonical
+    key, "silver nitrate" and "silver" stay different.
+    """
+    return names.astype(str).str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+
+
+def candidate_features(candidates: pd.DataFrame, canonicalization_params: dict, params: dict) -> pd.DataFrame:
+    """
+    Scores every (concept, candidate) pair in one pass.
+
+    Args:
+        candidates (pd.DataFrame): one row per candidate with row, rank, concept, curie and label
+        params (dict): see improve_ids_reranker in parameters.yml
+
+    Returns:
+        pd.DataFrame: candidates with the canonical concept and label keys, the features (tfidf,
+        edit, containment, extra, prefix, rank_score) and their weighted score, and label_exact
+        (the label is the concept as written, up to case and punctuation)
+    """
+    candidates = candidates.copy()
+    candidates['concept_key'] = canonicalize.canonicalize_series(candidates['concept'], canonicalization_params).fillna("").to_numpy()
+    candidates['label_key'] = canonicalize.canonicalize_series(candidates['label'], canonicalization_params).fillna("").to_numpy()
+    candidates['tfidf'] = lexical_similarity.tfidf_cosine(candidates['concept_key'], candidates['label_key'], params.get('ngram_range', (2, 4)))
+    candidates['edit'] = [lexical_similarity.edit_similarity(a, b) for a, b in zip(candidates['concept_key'], candidates['label_key'])]
+
+    # active moieties are the canonical components; all of the concept's should be in the label
+    concept_moieties = candidates['concept_key'].str.split("; ").map(set)
+    label_moieties = candidates['label_key'].str.split("; ").map(set)
+    candidates['containment'] = [len(a & b) / len(a) if a else 0.0 for a, b in zip(concept_moieties, label_moieties)]
+    candidates['extra'] = [len(b - a) / len(b) if b else 1.0 for a, b in zip(concept_moieties, label_moieties)]
+
+    priority = params.get('prefix_priority') or []
+    prefixes = candidates['curie'].astype(str).str.split(":").str[0]
+    candidates['prefix'] = prefixes.map({prefix: 1 - i / len(priority) for i, prefix in enumerate(priority)}).fillna(0.0)
+    candidates['rank_score'] = 1 - candidates['rank'] / candidates.groupby('row')['rank'].transform('size')
+    # the uncanonicalized strings, so salt forms the keys collapse can still be told apart
+    candidates['label_exact'] = raw_form(candidates['concept']) == raw_form(candidates['label'])
+
+    weights = params['weights']
+    candidates['score'] = (
+        weights['tfidf'] * candidates['tfidf']
+        + weights['edit'] * candidates['edit']
+        + weights['containment'] * candidates['containment']
+        - weights['extra'] * candidates['extra']
+        + weights['prefix'] * candidates['prefix']
+        + weights['rank'] * candidates['rank_score']
+    )
+    return candidates
+
+
+def rerank_candidates(concepts: dict, candidates: dict, canonicalization_params: dict, params: dict) -> pd.DataFrame:
+    """
+    Reranks the NameRes candidates of each concept locally.
+
+    Candidates with the same canonical key (fentanyl, fentanyl citrate) are one option, represented
+    by its simplest member (shortest label, then prefix priority, then NameRes rank), as the LLM
+    prompt asks. A row is decided when its best option contains all of the concept's moieties,
+    scores at least min_score and beats the next option by at least margin. With
+    require_exact_label, one of the option's labels must also be the concept exactly as written
+    (up to case and punctuation), so an option is never auto-decided on a canonical key alone
+    ("silver nitrate" is not decided as "silver").
+
+    Args:
+        concepts (dict): row -> source concept
+        candidates (dict): row -> (curies, labels) in NameRes order
+
+    Returns:
+        pd.DataFrame: per row, the decided curie (None if undecided), score, margin and the
+        representatives of the top_k options, to put in the LLM prompt
+    """
+    rows = [
+        (row, rank, concepts[row], curie, label)
+        for row, (curies, labels) in candidates.items()
+        for rank, (curie, label) in enumerate(zip(curies, labels))
+        if curie != "Error"
+    ]
+    result = pd.DataFrame(index=pd.Index(list(candidates), name='row'), columns=['decision', 'score', 'margin', 'top_curies', 'top_labels'], dtype=object)
+    if not rows:
+        return result
+    scored = candidate_features(pd.DataFrame(rows, columns=['row', 'rank', 'concept', 'curie', 'label']), canonicalization_params, params)
+    scored['label_length'] = scored['label'].astype(str).str.len()
+    # one option per canonical key, best-scoring key first, simplest member as its representative
+    options = scored.sort_values(['row', 'label_length', 'prefix', 'rank'], ascending=[True, True, False, True]).drop_duplicates(['row', 'label_key'])
+    best_of_key = scored.groupby(['row', 'label_key'], as_index=False).agg(score=('score', 'max'), any_exact=('label_exact', 'any'))
+    options = options.drop(columns='score').merge(best_of_key, on=['row', 'label_key'])
+    options = options.sort_values(['row', 'score'], ascending=[True, False])
+
+    top_k = params.get('top_k', 5)
+    for row, group in options.groupby('row', sort=False):
+        best = group.iloc[0]
+        margin = best['score'] - group.iloc[1]['score'] if len(group) > 1 else best['score']
+        decided = best['containment'] == 1 and best['score'] >= params['min_score'] and margin >= params['margin']
+        if params.get('require_exact_label', True):
+            decided = decided and best['any_exact']
+        pruned = group.head(top_k)
+        result.loc[row] = [best['curie'] if decided else None, round(best['score'], 3), round(margin, 3), list(pruned['curie']), list(pruned['label'])]
+    return result
@@ -0,0 +1,109 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import cache
+
+
+class ResponseCache:
+    """
+    Persistent cache for external service responses, stored in a local SQLite file.
+
+    Entries are stored per service together with the service version they were fetched
+    from, so a new Babel/NodeNorm release can be invalidated without touching the others.
+    Only successful responses should be written; callers are responsible for that.
+    """
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                service TEXT NOT NULL,
+                key TEXT NOT NULL,
+                version TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                value TEXT NOT NULL,
+                PRIMARY KEY (service, key)
+            )"""
+        )
+        self._conn.commit()
+
+    def get(self, service: str, key: str, version: str, ttl_days: float = None):
+        """
+        Returns the cached value, or None if missing, expired or from another service version.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT version, created_at, value FROM responses WHERE service = ? AND key = ?",
+                (service, key),
+            ).fetchone()
+        if row is None:
+            return None
+        cached_version, created_at, value = row
+        if cached_version != str(version):
+            return None
+        if ttl_days is not None and time.time() - created_at > ttl_days * 86400:
+            return None
+        return json.loads(value)
+
+    def set(self, service: str, key: str, value, version: str):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (service, key, version, created_at, value) VALUES (?, ?, ?, ?, ?)",
+                (service, key, str(version), time.time(), json.dumps(value)),
+            )
+            self._conn.commit()
+
+    def invalidate(self, service: str, keep_version: str = None) -> int:
+        """
+        Deletes the entries of a service. If keep_version is given, only entries fetched from
+        other versions of the service are deleted.
+
+        Returns:
+            int: number of deleted entries
+        """
+        with self._lock:
+            if keep_version is None:
+                cursor = self._conn.execute("DELETE FROM responses WHERE service = ?", (service,))
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM responses WHERE service = ? AND version != ?",
+                    (service, str(keep_version)),
+                )
+            self._conn.commit()
+            return cursor.rowcount
+
+
+@cache
+def open_cache(path: str) -> ResponseCache:
+    return ResponseCache(path)
+
+
+def make_key(url: str, params: dict = None) -> str:
+    """
+    Builds the cache key for a request from its URL and (order-independent) parameters.
+    """
+    payload = json.dumps({"url": url, "params": params or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def cache_from_params(params: dict):
+    """
+    Args:
+        params (dict): service parameters, optionally containing a 'cache' block with
+            path, ttl_days and version (see nodenorm_params in parameters.yml)
+
+    Returns:
+        tuple: (ResponseCache, cache settings), or (None, None) if caching is not configured
+    """
+    settings = params.get('cache')
+    if not settings or not settings.get('enabled', True):
+        return None, None
+    return open_cache(settings['path']), settings
@@ -0,0 +1,13 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+
+@pytest.fixture(scope="session")
+def parameters():
+    """
+    The project's conf/base/parameters.yml, so the tests run against the configured rules.
+    """
+    with open(Path(__file__).parents[3] / "conf" / "base" / "parameters.yml") as f:
+        return yaml.safe_load(f)
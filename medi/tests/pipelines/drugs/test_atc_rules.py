@@ -0,0 +1,25 @@
+import pandas as pd
+
+from medi.utils import atc_rules
+
+
+def test_parse_atc_codes():
+    assert atc_rules.parse_atc_codes("['H02AB06', 'J01MA02']") == ['H02AB06', 'J01MA02']
+    assert atc_rules.parse_atc_codes(['A10BA02']) == ['A10BA02']
+    assert atc_rules.parse_atc_codes(float('nan')) == []
+
+
+def test_flags_from_atc(parameters):
+    codes = pd.Series([['A10BA02'], "['H02AB09', 'D07AA02']", ['H02AB06', 'J01MA02'], [], None])
+    flags = atc_rules.flags_from_atc(codes, parameters['atc_tag_rules'])
+    assert flags['is_glucose_regulator'].tolist() == [True, None, None, None, None]
+    assert flags['is_steroid'].tolist() == [None, True, None, None, None]
+    assert flags['is_antimicrobial'].tolist() == [None, None, None, None, None]
+
+
+def test_codes_outside_the_prefixes_do_not_rule_a_tag_out(parameters):
+    codes = pd.Series([['S01JA01'], ['R03AK07'], ['V04CF01']])
+    flags = atc_rules.flags_from_atc(codes, parameters['atc_tag_rules'])
+    assert flags['is_radioisotope_or_diagnostic_agent'].tolist() == [None, None, True]
+    assert flags['is_steroid'].tolist() == [None, None, None]
+    assert flags['is_vaccine_or_antigen'].tolist() == [None, None, None]
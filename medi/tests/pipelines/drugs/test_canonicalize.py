@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from medi.utils import canonicalize
+
+
+def canonical(name, parameters):
+    return canonicalize.canonicalize_series(pd.Series([name]), parameters['ingredient_canonicalization'])[0]
+
+
+@pytest.mark.parametrize("name, key", [
+    ("FENTANYL CITRATE", "fentanyl"),
+    ("fentanyl citrate ", "fentanyl"),
+    ("morphine sulfate pentahydrate", "morphine"),
+    ("sodium chloride", "sodium chloride"),
+    ("amoxicillin/clavulanate potassium", "amoxicillin; clavulanate"),
+    ("clavulanate potassium + amoxicillin", "amoxicillin; clavulanate"),
+])
+def test_salt_forms_and_components(name, key, parameters):
+    assert canonical(name, parameters) == key
+
+
+def test_ratios_are_not_split(parameters):
+    assert canonical("Insulin 70/30", parameters) == "insulin 70 30"
+
+
+@pytest.mark.parametrize("name, key", [
+    ("Rasagiline (as mesylate ) Tablet 0.5mg/1mg", "rasagiline as mesylate tablet"),
+    ("Temsirolimus 25mg/ml", "temsirolimus"),
+    ("Hydrocortisone 1% w/w cream", "hydrocortisone cream"),
+    ("amoxicillin 500 mg / clavulanate 125 mg", "amoxicillin; clavulanate"),
+    ("sodium chloride 0.9% w/v", "sodium chloride"),
+])
+def test_strengths_are_removed_before_splitting(name, key, parameters):
+    assert canonical(name, parameters) == key
+
+
+@pytest.mark.parametrize("name, key", [
+    ("BARIUM SULFATE", "barium sulfate"),
+    ("FERROUS SULFATE", "ferrous sulfate"),
+    ("SILVER NITRATE", "silver nitrate"),
+    ("CUPRIC CHLORIDE", "cupric chloride"),
+    ("BENZYL BENZOATE", "benzyl benzoate"),
+    ("gadoterate meglumine", "gadoterate meglumine"),
+    ("ferric pyrophosphate citrate", "ferric pyrophosphate citrate"),
+])
+def test_inorganic_actives_keep_their_anion(name, key, parameters):
+    assert canonical(name, parameters) == key
+
+
+def test_delimiter_pattern_keeps_ratios():
+    pattern = canonicalize.delimiter_pattern(["/", " and "])
+    assert pattern.split("insulin 70/30") == ["insulin 70/30"]
+    assert pattern.split("a/b And c") == ["a", "b", "c"]
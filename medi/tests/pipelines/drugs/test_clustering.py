@@ -0,0 +1,67 @@
+import pytest
+
+from medi.utils import clustering
+
+PARAMS = {
+    'threshold': 0.85,
+    'ngram': 3,
+    'num_perm': 64,
+    'bands': 16,
+    'seed': 42,
+    'min_typo_chars': 5,
+    'max_typo_edits': 2,
+    'ignore_tokens': ['inj', 'injection'],
+}
+
+
+def representatives(strings):
+    clusters = clustering.cluster_strings(strings, PARAMS)
+    return dict(zip(clusters['member'], clusters['cluster_representative']))
+
+
+@pytest.mark.parametrize("a, b", [
+    ("coagulation factor viii recombinant human", "coagulation factor viia recombinant human"),
+    ("hepatitis b vaccine inactivated", "hepatitis a vaccine inactivated"),
+    ("botulinum toxin type b", "botulinum toxin type a"),
+    ("avalglucosidase alfa", "alglucosidase alfa"),
+    (
+        "calcium chloride; magnesium chloride; potassium chloride; sodium acetate; sodium chloride",
+        "calcium acetate; magnesium acetate; potassium acetate; sodium acetate; sodium chloride",
+    ),
+    (
+        "amino acids; magnesium chloride; potassium phosphate dibasic; sodium acetate; sodium chloride",
+        "amino acids; magnesium acetate; potassium acetate; sodium chloride; sodium phosphate dibasic",
+    ),
+])
+def test_different_products_are_not_merged(a, b):
+    result = representatives([a, b])
+    assert result[a] == a
+    assert result[b] == b
+
+
+def test_typos_and_dosage_forms_are_merged():
+    result = representatives(["amoxicillin clavulanate", "amoxicillin clavulanate inj", "amoxicilin clavulanate"])
+    assert len(set(result.values())) == 1
+
+
+def test_components_keep_their_order_but_not_each_other():
+    assert clustering.prepare("Sodium Chloride; calcium acetate inj", PARAMS) == "calcium acetate; sodium chloride"
+
+
+def test_numbers_must_match():
+    result = representatives(["insulin 70 30", "insulin 50 50"])
+    assert result["insulin 70 30"] != result["insulin 50 50"]
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("factor viii", "factor viia", False),
+    ("hepatitis a", "hepatitis b", False),
+    ("amoxicillin", "amoxicilin", True),
+    ("amoxicillin", "amoxicillin clavulanate", False),
+    ("cefuroxime", "ceftriaxone", False),
+    ("avalglucosidase alfa", "alglucosidase alfa", False),
+    ("calcium chloride; sodium acetate", "calcium acetate; sodium chloride", False),
+    ("clavulanate; amoxicillin", "amoxicilin; clavulanate", True),
+])
+def test_tokens_compatible(a, b, expected):
+    assert clustering.tokens_compatible(a, b, PARAMS) is expected
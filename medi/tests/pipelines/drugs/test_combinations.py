@@ -0,0 +1,42 @@
+import pandas as pd
+
+from medi.utils import combinations
+
+
+def analyze(names, parameters):
+    return combinations.analyze_combinations(pd.Series(names), parameters['ingredient_canonicalization'], parameters['combination_rules'])
+
+
+def test_combinations_are_split(parameters):
+    result = analyze(["amoxicillin / clavulanate potassium", "Lopinavir and Ritonavir"], parameters)
+    assert result['is_combination_therapy'].tolist() == [True, True]
+    assert result['combination_therapy_ingredients'].tolist() == ["amoxicillin|clavulanate potassium", "Lopinavir|Ritonavir"]
+    assert result['confident'].all()
+
+
+def test_single_ingredients(parameters):
+    result = analyze(["insulin 70/30", "fentanyl citrate; fentanyl hydrochloride", "morphine sulfate"], parameters)
+    assert result['is_combination_therapy'].tolist() == [False, False, False]
+    assert result['combination_therapy_ingredients'].tolist() == ["", "", ""]
+
+
+def test_ambiguous_names_are_left_to_the_llm(parameters):
+    result = analyze(["pollen extract / mixed grasses", "tetanus, diphtheria", "a/b", "aspirin| aspirin; caffeine"], parameters)
+    assert not result['confident'].any()
+    assert result['is_combination_therapy'].isna().all()
+
+
+def test_joined_alternatives_must_agree(parameters):
+    result = analyze(["aspirin; caffeine| caffeine + aspirin"], parameters)
+    assert result['is_combination_therapy'].tolist() == [True]
+
+
+def test_dosage_strings_are_not_split(parameters):
+    result = analyze(["Hydrocortisone 1% w/w cream", "Temsirolimus 25mg/ml", "amoxicillin 500 mg / clavulanate 125 mg"], parameters)
+    assert result['is_combination_therapy'].tolist() == [False, False, True]
+    assert result['combination_therapy_ingredients'].tolist() == ["", "", "amoxicillin|clavulanate"]
+
+
+def test_fragments_are_not_confident(parameters):
+    result = analyze(["hydrocortisone cream 1 oz/2 oz"], parameters)
+    assert not result['confident'][0]
@@ -0,0 +1,40 @@
+import pandas as pd
+import pytest
+
+from medi.pipelines.drugs import convert_dates_pb
+from medi.utils import dates
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("19760101", "19760101"),
+    ("19760101.0", "19760101"),
+    ("2001-03-15", "20010315"),
+    ("15/03/2001", "20010315"),
+    ("15.03.2001", "20010315"),
+    ("15-Mar-01", "20010315"),
+    ("15 Sept. 2001", "20010915"),
+    ("Mar 15, 2001", "20010315"),
+    ("March 2001", "20010301"),
+    ("2001", "20010101"),
+    ("15-Mar-99", "19990315"),
+    ("Approved prior to Jan 1, 1982", "19820101"),
+])
+def test_parse_dates(value, expected, parameters):
+    assert dates.parse_dates(pd.Series([value]), parameters['date_parsing'])[0] == expected
+
+
+def test_unparsed_and_missing_values(parameters):
+    parsed = dates.parse_dates(pd.Series(["sometime in spring", None]), parameters['date_parsing'])
+    assert parsed.isna().all()
+
+
+def test_reformat_dates_without_llm_marks_the_residue(parameters):
+    df = pd.DataFrame({'approval_date': ["2001-03-15", "sometime in spring", "2001-03-15"]})
+    result = dates.reformat_dates(df, parameters['date_parsing'])
+    assert result['approval_date'].tolist() == ["20010315", "XXXXXXXX", "20010315"]
+
+
+def test_convert_date_format_uses_the_shared_parser():
+    df = pd.DataFrame({'approval_date': ["15-Mar-01", "15-Mar-99", "unknown"]})
+    result = convert_dates_pb.convert_date_format(df)
+    assert result['approval_date'].tolist() == ["20010315", "19990315", "unknown"]
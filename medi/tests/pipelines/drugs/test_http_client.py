@@ -0,0 +1,73 @@
+import pytest
+import requests
+
+from medi.utils import http_client
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_client.time, "monotonic", clock)
+    return clock
+
+
+def response(status):
+    result = requests.Response()
+    result.status_code = status
+    return result
+
+
+def client(statuses):
+    """A client whose session answers with the given statuses in turn, without retry delays."""
+    result = http_client.HttpClient({"max_retries": 5, "backoff_base": 0, "default_rate_per_second": 1000})
+    answers = iter(statuses)
+    result.session.request = lambda method, url, **kwargs: response(next(answers))
+    return result
+
+
+def test_one_failing_request_does_not_open_the_breaker():
+    http = client([500] * 6 + [200])
+    assert http.get("https://nameres.example/lookup").status_code == 500
+    assert http.get("https://nameres.example/lookup").status_code == 200
+
+
+def test_breaker_opens_after_threshold_failed_requests():
+    http = client([500] * 30)
+    for _ in range(5):
+        http.get("https://nameres.example/lookup")
+    with pytest.raises(http_client.CircuitOpenError):
+        http.get("https://nameres.example/lookup")
+
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = http_client.CircuitBreaker(failure_threshold=2, reset_seconds=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert not breaker.allow()
+    clock.now = 10
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.allow()
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens(clock):
+    breaker = http_client.CircuitBreaker(failure_threshold=2, reset_seconds=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.now = 10
+    assert breaker.allow()
+    breaker.record_failure()
+    clock.now = 15
+    assert not breaker.allow()
+    clock.now = 20
+    assert breaker.allow()
@@ -0,0 +1,43 @@
+import pandas as pd
+
+from medi.utils import incremental
+
+TAGS = {
+    'steroid': {'output_col': 'is_steroid', 'model_params': {'model': 'gpt-4o', 'prompt': 'corticosteroid?', 'temperature': 0}},
+    'chemo': {'output_col': 'is_chemotherapy', 'model_params': {'model': 'gpt-4o', 'prompt': 'chemotherapy?', 'temperature': 0}},
+}
+
+
+def previous_release(parameters):
+    df = pd.DataFrame({
+        'corrected_curie_norm': ['CHEBI:1', 'CHEBI:2'],
+        'corrected_curie_norm_label': ['prednisone', 'cisplatin'],
+        'is_steroid': [True, False],
+        'is_chemotherapy': [False, True],
+    })
+    hashes = incremental.tag_hashes(df, TAGS, 'corrected_curie_norm_label')
+    df = incremental.store_hashes(df, hashes, parameters['incremental_tagging'])
+    return df.rename(columns={'corrected_curie_norm': 'curie'})
+
+
+def test_unchanged_flags_are_carried_forward(parameters):
+    current = pd.DataFrame({'corrected_curie_norm': ['CHEBI:1', 'CHEBI:2', 'CHEBI:3'], 'corrected_curie_norm_label': ['prednisone', 'cisplatin (renamed)', 'new drug']})
+    carried, _ = incremental.carry_forward(current, previous_release(parameters), TAGS, 'corrected_curie_norm_label', parameters['incremental_tagging'])
+    assert carried['is_steroid'].tolist() == [True, None, None]
+    assert carried['is_chemotherapy'].tolist() == [False, None, None]
+
+
+def test_changed_prompt_is_not_carried_forward(parameters):
+    tags = {**TAGS, 'chemo': {**TAGS['chemo'], 'model_params': {**TAGS['chemo']['model_params'], 'prompt': 'cytotoxic?'}}}
+    current = pd.DataFrame({'corrected_curie_norm': ['CHEBI:1'], 'corrected_curie_norm_label': ['prednisone']})
+    carried, _ = incremental.carry_forward(current, previous_release(parameters), tags, 'corrected_curie_norm_label', parameters['incremental_tagging'])
+    assert carried['is_steroid'].tolist() == [True]
+    assert carried['is_chemotherapy'].tolist() == [None]
+
+
+def test_release_without_hashes_carries_nothing(parameters):
+    current = pd.DataFrame({'corrected_curie_norm': ['CHEBI:1'], 'corrected_curie_norm_label': ['prednisone']})
+    old = previous_release(parameters).drop(columns='enrichment_hashes')
+    carried, hashes = incremental.carry_forward(current, old, TAGS, 'corrected_curie_norm_label', parameters['incremental_tagging'])
+    assert carried.isna().all().all()
+    assert list(hashes.columns) == ['is_steroid', 'is_chemotherapy']
@@ -0,0 +1,20 @@
+from medi.utils import journal
+
+
+def test_journal_resumes_and_skips_half_written_lines(tmp_path, monkeypatch):
+    monkeypatch.setattr(journal, "_params", {"enabled": True, "dir": str(tmp_path)})
+    checkpoint = journal.open_journal("node", ["a", "b"])
+    checkpoint.record("a", ["CHEBI:1"])
+    with open(checkpoint.path, "a") as f:
+        f.write('{"key": "b", "val')
+    resumed = journal.open_journal("node", ["a", "b"])
+    assert "a" in resumed and resumed["a"] == ["CHEBI:1"]
+    assert "b" not in resumed
+    assert "a" not in journal.open_journal("node", ["a", "c"])
+
+
+def test_disabled_journal_remembers_nothing(monkeypatch):
+    monkeypatch.setattr(journal, "_params", None)
+    checkpoint = journal.open_journal("node", ["a"])
+    checkpoint.record("a", 1)
+    assert "a" not in checkpoint
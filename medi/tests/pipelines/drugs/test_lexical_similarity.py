@@ -0,0 +1,17 @@
+import pandas as pd
+
+from medi.utils import lexical_similarity
+
+
+def test_token_set_ratio_ignores_order_and_connectors():
+    assert lexical_similarity.token_set_ratio("codeine; acetaminophen", "acetaminophen codeine") == 1.0
+
+
+def test_classify_pairs(parameters):
+    left = pd.Series(["FENTANYL CITRATE", "acetaminophen and codeine", "ibuprofen", "metformin"])
+    right = pd.Series(["fentanyl", "codeine / acetaminophen", "ketoconazole", "metformin xr"])
+    scores = lexical_similarity.score_pairs(left, right, parameters['ingredient_canonicalization'], parameters['qc_lexical_params'])
+    decisions = lexical_similarity.classify_pairs(scores, parameters['qc_lexical_params'])
+    assert decisions['method'].tolist() == ["exact", "exact", "lexical_reject", "llm"]
+    assert decisions['decision'].tolist()[:3] == [True, True, False]
+    assert decisions['decision'][3] is None
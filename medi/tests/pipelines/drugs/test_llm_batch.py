@@ -0,0 +1,119 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from medi.utils import llm_batch
+
+
+class StandInBatchServer(ThreadingHTTPServer):
+    """
+    Minimal local stand-in for the OpenAI files and batches endpoints. Every batch ends with
+    final_status after one poll, answering each request with its custom_id.
+    """
+
+    def __init__(self, final_status="completed"):
+        super().__init__(("127.0.0.1", 0), StandInHandler)
+        self.final_status = final_status
+        self.files = {}
+        self.batches = {}
+        self.polls = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def _send(self, body, content_type="application/json"):
+        data = body if isinstance(body, bytes) else json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _batch(self, batch_id):
+        batch = self.server.batches[batch_id]
+        return {
+            "id": batch_id, "object": "batch", "endpoint": "/v1/chat/completions", "completion_window": "24h",
+            "input_file_id": batch["input_file_id"], "created_at": 0, "status": batch["status"],
+            "output_file_id": batch.get("output_file_id"), "error_file_id": None,
+            "request_counts": {"completed": 0, "failed": 0, "total": len(batch["lines"])},
+        }
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path == "/v1/files":
+            file_id = f"file-{len(self.server.files)}"
+            self.server.files[file_id] = [line for line in body.decode("utf-8").splitlines() if line.startswith('{"body"')]
+            self._send({"id": file_id, "object": "file", "bytes": len(body), "created_at": 0, "filename": "input.jsonl", "purpose": "batch", "status": "processed"})
+        elif self.path == "/v1/batches":
+            request = json.loads(body)
+            batch_id = f"batch-{len(self.server.batches)}"
+            self.server.batches[batch_id] = {"input_file_id": request["input_file_id"], "status": "in_progress", "lines": self.server.files[request["input_file_id"]]}
+            self._send(self._batch(batch_id))
+
+    def do_GET(self):
+        if self.path.startswith("/v1/batches/"):
+            batch_id = self.path.rsplit("/", 1)[-1]
+            batch = self.server.batches[batch_id]
+            self.server.polls += 1
+            if batch["status"] == "in_progress":
+                batch["status"] = self.server.final_status
+                if self.server.final_status == "completed":
+                    output_id = f"file-{len(self.server.files)}"
+                    self.server.files[output_id] = [
+                        json.dumps({"custom_id": item["custom_id"], "response": {"status_code": 200, "body": {"choices": [{"message": {"content": item["custom_id"]}}]}}})
+                        for item in map(json.loads, batch["lines"])
+                    ]
+                    batch["output_file_id"] = output_id
+            self._send(self._batch(batch_id))
+        elif self.path.startswith("/v1/files/") and self.path.endswith("/content"):
+            file_id = self.path.split("/")[3]
+            self._send("\n".join(self.server.files[file_id]).encode("utf-8"), "application/jsonl")
+
+
+@pytest.fixture
+def server(request, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    server = StandInBatchServer(getattr(request, "param", "completed"))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+
+
+def lines(n):
+    return [
+        {"custom_id": f"request-{i}", "method": "POST", "url": "/v1/chat/completions", "body": llm_batch.chat_body([("human", f"drug {i}")], "gpt-4o-mini")}
+        for i in range(n)
+    ]
+
+
+def params(server, tmp_path):
+    return {"base_url": server.base_url, "state_dir": str(tmp_path), "poll_seconds": 0}
+
+
+def test_completed_batch_is_reused(server, tmp_path):
+    results = llm_batch.BatchJob(lines(3), params(server, tmp_path)).run()
+    assert results == {f"request-{i}": f"request-{i}" for i in range(3)}
+    assert llm_batch.BatchJob(lines(3), params(server, tmp_path)).run() == results
+    assert len(server.batches) == 1
+
+
+@pytest.mark.parametrize("server", ["failed", "expired", "cancelled"], indirect=True)
+def test_unfinished_batch_is_resubmitted(server, tmp_path):
+    assert llm_batch.BatchJob(lines(2), params(server, tmp_path)).run() == {}
+    assert llm_batch.BatchJob(lines(2), params(server, tmp_path)).run() == {}
+    assert len(server.batches) == 2
+
+
+def test_interrupted_batch_is_resumed(server, tmp_path):
+    job = llm_batch.BatchJob(lines(2), params(server, tmp_path))
+    job.submit()
+    assert len(llm_batch.BatchJob(lines(2), params(server, tmp_path)).run()) == 2
+    assert len(server.batches) == 1
@@ -0,0 +1,19 @@
+from medi.utils import llm_cache
+
+
+def test_llm_cache_evicts_least_recently_used(tmp_path):
+    cache = llm_cache.LLMCache(str(tmp_path / "llm.sqlite"), max_bytes=300)
+    keys = [llm_cache.make_key("openai", "gpt-4o", 0, [("human", f"drug {i}")]) for i in range(3)]
+    cache.set(keys[0], "x" * 50, "openai", "gpt-4o")
+    cache.set(keys[1], "y" * 50, "openai", "gpt-4o")
+    assert cache.get(keys[0]) == "x" * 50
+    cache.set(keys[2], "z" * 50, "openai", "gpt-4o")
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == "x" * 50
+    assert cache.get(keys[2]) == "z" * 50
+
+
+def test_llm_cache_key_covers_the_request():
+    key = llm_cache.make_key("openai", "gpt-4o", 0, [("human", "aspirin")])
+    assert key != llm_cache.make_key("openai", "gpt-4o", 0.5, [("human", "aspirin")])
+    assert key != llm_cache.make_key("openai", "gpt-4o", 0, [("human", "aspirin")], {"type": "json_object"})
@@ -0,0 +1,48 @@
+import json
+
+import pandas as pd
+
+from medi.utils import local_nameres
+
+
+def build(tmp_path, filename, write):
+    path = tmp_path / filename
+    write(path)
+    local_nameres.build_index(str(path), str(tmp_path / "index"))
+    return local_nameres.LocalNameIndex(str(tmp_path / "index"))
+
+
+def test_untyped_history_passes_the_type_filter(tmp_path):
+    index = build(tmp_path, "history.csv", lambda path: pd.DataFrame({
+        'curie': ['CHEBI:5134', 'CHEBI:8382'],
+        'label': ['fentanyl', 'prednisone'],
+    }).to_csv(path, index=False))
+    curies, labels = index.lookup("fentanyl", limit=1, biolink_types=["biolink:ChemicalEntity"])
+    assert curies == ['CHEBI:5134']
+    assert labels == ['fentanyl']
+
+
+def test_typed_entries_are_filtered(tmp_path):
+    entries = [
+        {'curie': 'CHEBI:5134', 'preferred_name': 'fentanyl', 'names': [], 'types': ['biolink:SmallMolecule']},
+        {'curie': 'MONDO:1', 'preferred_name': 'fentanyl overdose', 'names': [], 'types': ['biolink:Disease']},
+    ]
+    index = build(tmp_path, "synonyms.jsonl", lambda path: path.write_text("\n".join(json.dumps(entry) for entry in entries)))
+    curies, _ = index.lookup("fentanyl", limit=5, biolink_types=["biolink:SmallMolecule"])
+    assert curies == ['CHEBI:5134']
+    curies, _ = index.lookup("fentanyl", limit=5, exclude_prefixes=["CHEBI"])
+    assert curies == ['MONDO:1']
+
+
+def test_common_trigrams_are_skipped(tmp_path):
+    names = ['fentanyl', 'sufentanil', 'alfentanil', 'remifentanil', 'prednisone']
+    path = tmp_path / "history.csv"
+    pd.DataFrame({'curie': [f"CHEBI:{i}" for i in range(len(names))], 'label': names}).to_csv(path, index=False)
+    local_nameres.build_index(str(path), str(tmp_path / "index"))
+    index = local_nameres.LocalNameIndex(str(tmp_path / "index"), max_postings=1)
+    query = index.vectorizer.transform(["remifentanil"])
+    kept = [term for term, _ in index.query_terms(query.indices, query.data)]
+    assert 0 < len(kept) < query.nnz
+    assert index.lookup("remifentanil", limit=1)[1] == ['remifentanil']
+    # every trigram of "entani" is common, so its rarest ones are used
+    assert len(index.lookup("entani", limit=2)[0]) == 2
@@ -0,0 +1,64 @@
+import json
+import re
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from medi.utils import llm_cache, openai_tags
+
+ANSWERS = {"aspirin": "TRUE", "insulin": False, "water": "maybe"}
+
+TAGS = {
+    'steroid': {
+        'output_col': 'is_steroid',
+        'model_params': {'model': 'gpt-4o', 'prompt': "Is this drug a corticosteroid drug? Return TRUE or FALSE only.", 'temperature': 0},
+    },
+}
+
+
+def fake_batch_json_prompts(prompt, model, drug_names, model_name, temp, description, batch_params=None):
+    contents = []
+    for item in drug_names:
+        lines = [re.match(r"(\d+): (.*)", line) for line in item.split("\n")]
+        if all(lines):
+            results = [{'id': match.group(1), 'is_steroid': ANSWERS[match.group(2)]} for match in lines]
+            contents.append(json.dumps({'results': results}))
+        else:
+            contents.append(json.dumps({'is_steroid': ANSWERS[item]}))
+    return contents
+
+
+@pytest.mark.parametrize("tagging_params", [
+    None,
+    {'mode': "single"},
+    {'mode': "combined", 'fallback_to_single': True, 'system_prompt': "Answer with JSON."},
+    {'mode': "packed", 'token_budget': 2000, 'max_items': 50, 'chars_per_token': 4, 'tokens_per_item': 6},
+])
+def test_every_mode_returns_bools(tagging_params, monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test")
+    monkeypatch.setattr(openai_tags, "batch_json_prompts", fake_batch_json_prompts)
+    df = pd.DataFrame({'label': list(ANSWERS)})
+    result = openai_tags.add_tags(df, TAGS, 'label', tagging_params)
+    assert result['is_steroid'].tolist() == [True, False, None]
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, **body):
+        self.calls += 1
+        token = SimpleNamespace(token="TRUE", logprob=-0.01)
+        message = SimpleNamespace(content="TRUE")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message, logprobs=SimpleNamespace(content=[token]))])
+
+
+def test_logprob_prompts_reuse_the_shared_client(monkeypatch):
+    completions = FakeCompletions()
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    monkeypatch.setattr(openai_tags, "OpenAI", lambda **kwargs: pytest.fail("logprob_prompts created its own client"))
+    monkeypatch.setattr(openai_tags, "openai_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=completions)))
+    results = openai_tags.logprob_prompts([[("user", "aspirin")], [("user", "insulin")]], "gpt-4o-mini", 0, "test")
+    assert results == [("TRUE", [("TRUE", -0.01)])] * 2
+    assert completions.calls == 2
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from medi.utils import rerank
+
+
+def rerank_one(concept, curies, labels, parameters):
+    result = rerank.rerank_candidates({0: concept}, {0: (curies, labels)}, parameters['ingredient_canonicalization'], parameters['improve_ids_reranker'])
+    return result.loc[0]
+
+
+def test_salt_form_is_decided_as_its_moiety(parameters):
+    result = rerank_one("FENTANYL CITRATE", ["CHEBI:1", "CHEBI:2", "CHEBI:3"], ["fentanyl citrate", "fentanyl", "sufentanil"], parameters)
+    assert result['decision'] == "CHEBI:2"
+    assert result['top_labels'] == ["fentanyl", "sufentanil"]
+
+
+def test_inorganic_salt_is_not_decided_as_its_metal(parameters):
+    result = rerank_one("SILVER NITRATE", ["CHEBI:9140", "CHEBI:9141", "CHEBI:30512"], ["silver(1+) nitrate", "silver", "silver atom"], parameters)
+    assert pd.isna(result['decision'])
+    assert "CHEBI:9140" in result['top_curies']
+
+
+def test_no_exact_label_is_left_to_the_llm(parameters):
+    result = rerank_one("FENTANYL CITRATE", ["CHEBI:2", "CHEBI:3"], ["fentanyl", "sufentanil"], parameters)
+    assert pd.isna(result['decision'])
+
+
+def test_error_candidates_are_ignored(parameters):
+    result = rerank_one("aspirin", ["Error"], ["Error"], parameters)
+    assert pd.isna(result['decision'])
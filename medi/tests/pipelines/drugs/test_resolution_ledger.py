@@ -0,0 +1,33 @@
+import pandas as pd
+
+from medi.pipelines.drugs import nodes
+
+
+def test_seed_from_released_list(parameters):
+    released = pd.DataFrame({
+        'curie': ['CHEBI:1', 'CHEBI:2'],
+        'curie_label': ['Fentanyl', 'Nalidixic acid'],
+        'source_ingredients': ['FENTANYL CITRATE| fentanyl', 'NALIDIXIC ACID'],
+    })
+    seed = nodes.seed_ledger_from_list(released, parameters['ingredient_canonicalization'], parameters['resolution_ledger'])
+    assert dict(zip(seed['source_ingredients'], seed['corrected_curie_norm'])) == {'fentanyl': 'CHEBI:1', 'nalidixic acid': 'CHEBI:2'}
+    assert set(seed['corrected_curie_norm_label']) == {'Fentanyl', 'Nalidixic acid'}
+
+
+def test_seed_from_intermediate_list(parameters):
+    intermediate = pd.DataFrame({
+        'corrected_curie_norm': ['CHEBI:1'],
+        'corrected_curie_norm_label': ['Fentanyl'],
+        'source_ingredients': ['FENTANYL CITRATE'],
+        'alternate_ids': ["['CHEBI:1']"],
+    })
+    seed = nodes.seed_ledger_from_list(intermediate, parameters['ingredient_canonicalization'], parameters['resolution_ledger'])
+    assert seed['corrected_curie_norm'].tolist() == ['CHEBI:1']
+
+
+def test_list_without_curies_seeds_nothing(parameters):
+    ledger = pd.DataFrame(columns=['source_ingredients', 'corrected_curie', 'corrected_curie_norm', 'corrected_curie_norm_label', 'alternate_ids', 'resolved_at', 'ledger_source'])
+    registry = pd.DataFrame({'source_ingredients': ['fentanyl']})
+    to_resolve, reused = nodes.split_by_resolution_ledger(registry, ledger, pd.DataFrame({'name': ['x']}), parameters['resolution_ledger'], parameters['ingredient_canonicalization'])
+    assert to_resolve['source_ingredients'].tolist() == ['fentanyl']
+    assert len(reused) == 0
@@ -0,0 +1,18 @@
+import time
+
+from medi.utils import response_cache
+
+
+def test_response_cache_versions_and_ttl(tmp_path, monkeypatch):
+    cache = response_cache.ResponseCache(str(tmp_path / "responses.sqlite"))
+    cache.set("nodenorm", "key", {"curie": "CHEBI:1"}, "2025-01")
+    assert cache.get("nodenorm", "key", "2025-01") == {"curie": "CHEBI:1"}
+    assert cache.get("nodenorm", "key", "2025-02") is None
+    later = time.time() + 2 * 86400
+    monkeypatch.setattr(response_cache.time, "time", lambda: later)
+    assert cache.get("nodenorm", "key", "2025-01", ttl_days=1) is None
+    assert cache.invalidate("nodenorm", keep_version="2025-02") == 1
+
+
+def test_response_cache_key_ignores_parameter_order():
+    assert response_cache.make_key("https://x", {"a": 1, "b": 2}) == response_cache.make_key("https://x", {"b": 2, "a": 1})